@@ -9,4 +9,7 @@ JSON_DIR = Path(__file__).resolve().parent / "Quiz_Set"
 # 시험 설정
 NUM_QUESTIONS = 65
 PASS_CUTOFF, SAFE_CUTOFF, PERF_CUTOFF = 52, 55, 58
-DEFAULT_TIMER_MIN = 100  # 분 (None이면 타이머 끔)
\ No newline at end of file
+DEFAULT_TIMER_MIN = 100  # 분 (None이면 타이머 끔)
+PARTIAL_CREDIT = False   # True면 복수정답 문항에 부분 점수 (맞힌 정답 - 잘못 고른 보기) / 정답 수
+EXAM_MODE = "random"     # "random" = 무작위 출제, "review" = 간격 반복 일정(복습할 문항 먼저),
+                         # "weak" = 지난 기록의 오답률에 비례해 출제
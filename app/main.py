@@ -2,6 +2,7 @@
 # app/main.py
 # =========================
 import tkinter as tk
+from multiprocessing import freeze_support
 from app.ui.app_window import QuizApp
 #from app.gui import QuizApp
 
@@ -10,4 +11,5 @@ def run():
     app.mainloop()
 
 if __name__ == "__main__":
+    freeze_support()    # PyInstaller exe 에서 load_bank 프로세스 풀 사용 시 필요
     run()
@@ -0,0 +1,87 @@
+﻿# app/models/question.py
+import sys
+from collections.abc import Mapping
+
+from app.utils.labels import letters_to_mask, mask_to_letters
+
+INTERN_MAX = 80     # 이 길이 이하 보기 텍스트만 intern (서비스 이름 같은 짧은 보기가 많이 겹침)
+
+# to_dict / 반복 순서 (parse_cbt 가 쓰는 키 순서와 같음)
+KEYS = ("id", "group", "title", "context", "choices", "answers", "link", "links", "explain")
+_OPTIONAL = ("group", "title", "context", "link", "links", "explain")
+
+def _intern(s):
+    return sys.intern(s) if isinstance(s, str) and len(s) <= INTERN_MAX else s
+
+class Question(Mapping):
+    """문항 하나. dict 와 같은 키로 읽히지만(q["answers"], q.get("explain"))
+    정답은 비트마스크, 보기/링크는 튜플로 들고 있고 겹치는 문자열은 intern 함.
+    없는 선택 필드는 None 으로 두고 키 목록에서도 빠짐"""
+    __slots__ = ("id", "group", "title", "context", "choices", "answer_mask",
+                 "link", "links", "explain", "extra")
+
+    def __init__(self, id, choices, answer_mask: int, group=None, title=None, context=None,
+                 link=None, links=None, explain=None, extra=None):
+        self.id = id
+        self.group = _intern(group)
+        self.title = title
+        self.context = context
+        self.choices = tuple(_intern(c) for c in choices)
+        self.answer_mask = answer_mask
+        self.link = link
+        self.links = tuple(links) if links is not None else None
+        self.explain = explain
+        self.extra = extra or None      # 알 수 없는 키는 그대로 보관 (to_dict 때 되살림)
+
+    def __reduce__(self):
+        # 스냅샷 캐시용: __init__ 을 건너뛰고 슬롯만 채움.
+        # 같은 pickle 안에서 intern 된 문자열은 memo 로 한 번만 저장·복원되므로 공유도 유지됨
+        return (_restore, (tuple(getattr(self, k) for k in Question.__slots__),))
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Question":
+        extra = {k: v for k, v in d.items() if k not in KEYS}
+        return cls(d.get("id"), d.get("choices") or (), letters_to_mask(d.get("answers") or ()),
+                   **{k: d.get(k) for k in _OPTIONAL}, extra=extra)
+
+    def to_dict(self) -> dict:
+        d = {k: self[k] for k in self}
+        if isinstance(d.get("choices"), tuple):
+            d["choices"] = list(d["choices"])
+        if isinstance(d.get("links"), tuple):
+            d["links"] = list(d["links"])
+        return d
+
+    @property
+    def answers(self) -> list[str]:
+        return mask_to_letters(self.answer_mask)
+
+    def __getitem__(self, key):
+        if key == "answers":
+            return self.answers
+        if key in KEYS:
+            v = getattr(self, key)
+            if v is not None:
+                return v
+        elif self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __iter__(self):
+        for k in KEYS:
+            if k == "answers" or getattr(self, k) is not None:
+                yield k
+        if self.extra:
+            yield from self.extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"Question(id={self.id!r}, answers={self.answers})"
+
+def _restore(row: tuple) -> Question:
+    q = Question.__new__(Question)
+    (q.id, q.group, q.title, q.context, q.choices, q.answer_mask,
+     q.link, q.links, q.explain, q.extra) = row
+    return q
@@ -0,0 +1,70 @@
+# app/services/batch_grader.py
+# 답안지 여러 장 한 번에 채점 (NumPy 2.0 이상, pip install "numpy>=2.0" — 선택)
+# numpy 가 없거나 2.0 미만(np.bitwise_count 없음)이면 한 장씩 int.bit_count 로 채점 (결과는 같고 느림)
+#
+# - 답안지: (N장 × Q문항) 보기 비트마스크 배열 (A=bit0, grader 와 같은 표현)
+# - 정답 키: (Q,) 비트마스크
+# - 정답 여부/부분 점수/총점/합불 구간을 배열 연산 한 번으로 계산
+try:
+    import numpy as np
+    if not hasattr(np, "bitwise_count"):
+        raise ImportError("numpy>=2.0 필요")
+except ImportError:
+    np = None
+
+from app.services.grader import answer_mask, credit as _credit, status_from_score
+
+def key_vector(run: list):
+    """문항 목록 → 정답 키 (Q,)"""
+    if np is None:
+        return [answer_mask(q) for q in run]
+    return np.array([answer_mask(q) for q in run], dtype=np.uint32)
+
+def sheet_matrix(run: list, sheets: list[dict]):
+    """답안지 목록(id → 마스크 dict) → (N, Q) 배열 (문항 순서는 run 기준, 안 푼 문항은 0)"""
+    ids = [q.get("id") for q in run]
+    if np is None:
+        return [[s.get(qid, 0) for qid in ids] for s in sheets]
+    return np.array([[s.get(qid, 0) for qid in ids] for s in sheets], dtype=np.uint32).reshape(len(sheets), len(ids))
+
+def grade_batch(sheets, key, partial: bool = False, cutoffs=(52, 55, 58)) -> dict:
+    """(N, Q) 답안 마스크 + (Q,) 정답 키 → 채점 결과.
+    {"correct": (N,Q) bool, "credit": (N,Q) float, "scores": (N,), "status": (N,) 문자열}
+    partial 이면 grader.credit 과 같은 부분 점수로 총점 계산 (numpy 가 없으면 같은 키의 리스트)"""
+    if np is None:
+        return _grade_rows(sheets, key, partial, cutoffs)
+    sheets = np.asarray(sheets, dtype=np.uint32)
+    key = np.asarray(key, dtype=np.uint32)
+    correct = sheets == key
+
+    if partial:
+        hits = np.bitwise_count(sheets & key).astype(np.int16)
+        wrong = np.bitwise_count(sheets & ~key).astype(np.int16)
+        n_ans = np.bitwise_count(key).astype(np.float64)
+        credit = np.divide(np.maximum(hits - wrong, 0), n_ans,
+                           out=np.zeros(sheets.shape, dtype=np.float64), where=n_ans > 0)
+        credit[correct] = 1.0
+        scores = credit.sum(axis=1)
+    else:
+        credit = correct.astype(np.float64)
+        scores = correct.sum(axis=1)
+
+    # 합불 구간: 각 구간 대표 점수로 status_from_score 문구를 한 번씩만 만들어 인덱싱
+    total = key.shape[0]
+    edges = np.asarray(cutoffs)
+    labels = np.array([status_from_score(s, total, cutoffs) for s in (edges[0] - 1, *edges)])
+    status = labels[np.searchsorted(edges, scores, side="right")]
+    return {"correct": correct, "credit": credit, "scores": scores, "status": status}
+
+def _grade_rows(sheets, key, partial: bool, cutoffs) -> dict:
+    """numpy 없을 때: 한 장씩 채점"""
+    key = [int(k) for k in key]
+    correct, credits, scores = [], [], []
+    for row in sheets:
+        ok = [int(u) == k for u, k in zip(row, key)]
+        cr = [1.0 if o else (_credit(int(u), k) if partial else 0.0) for o, u, k in zip(ok, row, key)]
+        correct.append(ok)
+        credits.append(cr)
+        scores.append(sum(cr) if partial else sum(ok))
+    status = [status_from_score(s, len(key), cutoffs) for s in scores]
+    return {"correct": correct, "credit": credits, "scores": scores, "status": status}
@@ -1,29 +1,47 @@
 ﻿# app/services/grader.py
-from app.utils.labels import LETTERS
+from app.utils.labels import letters_to_mask
 
-def multi_required(q: dict) -> bool:
+def answer_mask(q) -> int:
+    """문항 정답 비트마스크 (Question 이면 저장된 값, dict 면 레터에서 계산)"""
+    mask = getattr(q, "answer_mask", None)
+    return mask if mask is not None else letters_to_mask(q.get("answers", []))
+
+def as_mask(picked) -> int:
+    """선택 상태 → 비트마스크 (이전 방식의 레터 set 도 허용)"""
+    return picked if isinstance(picked, int) else letters_to_mask(picked)
+
+def multi_required(q) -> bool:
     """문항이 복수정답인지 여부"""
-    return len(set(q.get("answers", []))) >= 2
+    return answer_mask(q).bit_count() >= 2
+
+def credit(user: int, answer: int) -> float:
+    """부분 점수: (맞힌 정답 수 - 잘못 고른 보기 수) / 정답 수, 0 미만은 0"""
+    hits = (user & answer).bit_count()
+    wrong = (user & ~answer).bit_count()
+    return max(0, hits - wrong) / answer.bit_count() if answer else 0.0
 
-def grade(run: list[dict], selected: dict[int, set[str]]) -> tuple[int, list[dict]]:
-    """채점 및 리뷰 생성"""
-    correct = 0
+def grade(run: list, selected: dict[int, int], partial: bool = False) -> tuple[int | float, list[dict]]:
+    """채점 및 리뷰 생성.
+    selected 는 id → 고른 보기 비트마스크. partial 이면 복수정답 문항에 부분 점수.
+    리뷰에는 마스크만 담고 레터 목록은 화면에 보여줄 때 mask_to_letters 로 만듦"""
+    score = 0
     review = []
     for q in run:
         qid = q.get("id")
-        ua = set(selected.get(qid, set()))
-        ca = set(q.get("answers", []))
+        ua = as_mask(selected.get(qid, 0))
+        ca = answer_mask(q)
         ok = ua == ca
-        if ok:
-            correct += 1
+        c = 1.0 if ok else credit(ua, ca)
+        score += c if partial else ok
         review.append({
             "id": qid,
             "title": (q.get("title") or "").strip(),
             "correct": ok,
-            "user": sorted(list(ua), key=lambda x: LETTERS.index(x)),
-            "answer": sorted(list(ca), key=lambda x: LETTERS.index(x)),
+            "credit": c,
+            "user_mask": ua,
+            "answer_mask": ca,
         })
-    return correct, review
+    return score, review
 
 def status_from_score(score: int, total: int, cutoffs=(52,55,58)) -> str:
     """점수에 따른 상태 문구"""
@@ -0,0 +1,121 @@
+# app/services/history.py
+# 응시 기록 (JSON 폴더의 history.jsonl, 세션 1건 = 1줄, 추가만 함)
+#
+# - 세션: 시각, 출처(gui/console), 출제 id 순서, 고른 보기 마스크, 소요 시간, 점수
+# - 문항별 누적 통계(응시 횟수, 오답 횟수, 마지막 출제 시각)는 history_stats.json 에
+#   기록할 때마다 바로 반영 → 통계를 볼 때 전체 기록을 다시 읽지 않음
+# - 통계 파일에는 어디까지 반영했는지(바이트 offset)도 저장 → 중간에 끊겨도 남은 줄만 다시 반영
+import json, os
+from datetime import datetime
+from pathlib import Path
+
+from app.services.grader import as_mask
+
+HISTORY_NAME = "history.jsonl"
+STATS_NAME = "history_stats.json"
+STATS_VERSION = 1
+
+def _empty_stats() -> dict:
+    return {"version": STATS_VERSION, "offset": 0, "sessions": 0, "questions": {}}
+
+def _apply(stats: dict, rec: dict):
+    """세션 1건을 문항별 통계에 반영"""
+    qs = stats["questions"]
+    wrong = set(map(str, rec.get("wrong", [])))
+    for qid in map(str, rec["ids"]):
+        s = qs.get(qid)
+        if s is None:
+            s = qs[qid] = {"attempts": 0, "wrong": 0, "last_seen": None}
+        s["attempts"] += 1
+        s["wrong"] += qid in wrong
+        s["last_seen"] = rec["ts"]
+    stats["sessions"] += 1
+
+def _catch_up(path: Path, stats: dict) -> bool:
+    """통계에 아직 반영 안 된 기록 줄(offset 이후)을 반영. 바뀌었으면 True"""
+    try:
+        size = path.stat().st_size
+    except FileNotFoundError:
+        size = 0
+    if size < stats["offset"]:          # 기록 파일이 새로 만들어짐 → 처음부터
+        stats.clear()
+        stats.update(_empty_stats())
+    if size == stats["offset"]:
+        return False
+    with open(path, "rb") as fh:
+        fh.seek(stats["offset"])
+        for line in fh:
+            if not line.endswith(b"\n"):     # 쓰다 만 마지막 줄은 다음에
+                break
+            if line.strip():
+                try:
+                    _apply(stats, json.loads(line))
+                except (ValueError, KeyError) as e:
+                    print(f"[WARN] {path.name} 깨진 줄 건너뜀: {e}")
+            stats["offset"] += len(line)
+    return True
+
+def _save_stats(path: Path, stats: dict):
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(stats, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, path)
+
+def load_stats(json_dir: Path) -> dict:
+    """문항별 누적 통계 {id(str): {"attempts", "wrong", "last_seen"}} (+ "sessions", "offset")"""
+    stats_path = json_dir / STATS_NAME
+    try:
+        stats = json.loads(stats_path.read_text(encoding="utf-8"))
+        if stats.get("version") != STATS_VERSION:
+            stats = _empty_stats()
+    except FileNotFoundError:
+        stats = _empty_stats()
+    except ValueError as e:
+        print(f"[WARN] {stats_path.name} 읽기 실패, 기록에서 다시 계산: {e}")
+        stats = _empty_stats()
+    if _catch_up(json_dir / HISTORY_NAME, stats):
+        try:
+            _save_stats(stats_path, stats)
+        except OSError as e:
+            print(f"[WARN] {stats_path.name} 저장 실패: {e}")
+    return stats
+
+def record_session(json_dir: Path, run: list, selected: dict, review: list[dict],
+                   score, duration_sec: float | None, source: str = "gui") -> dict:
+    """세션 1건 추가 + 문항 통계 갱신. selected 는 id → 보기 마스크(또는 레터 목록)"""
+    ids = [q.get("id") for q in run]
+    rec = {
+        "ts": datetime.now().isoformat(timespec="seconds"),
+        "source": source,
+        "ids": ids,
+        "selected": [as_mask(selected.get(qid, 0)) for qid in ids],
+        "wrong": [r["id"] for r in review if not r["correct"]],
+        "score": score,
+        "total": len(ids),
+        "duration_sec": None if duration_sec is None else round(duration_sec, 1),
+    }
+    stats = load_stats(json_dir)        # 이전 기록까지 반영된 상태로 맞춤
+    path = json_dir / HISTORY_NAME
+    with open(path, "ab") as fh:
+        if fh.tell() != stats["offset"]:   # 쓰다 만 줄이 남아 있으면 닫아서 따로 떨어뜨림
+            fh.write(b"\n")
+        fh.write((json.dumps(rec, ensure_ascii=False) + "\n").encode("utf-8"))
+    _catch_up(path, stats)
+    try:
+        _save_stats(json_dir / STATS_NAME, stats)
+    except OSError as e:                # 다음 load_stats 때 남은 줄부터 다시 반영됨
+        print(f"[WARN] {STATS_NAME} 저장 실패: {e}")
+    return rec
+
+def iter_sessions(json_dir: Path):
+    """전체 기록 (대시보드용이 아니라 세션 상세를 볼 때만)"""
+    path = json_dir / HISTORY_NAME
+    if not path.exists():
+        return
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:          # 중간에 끊겨 깨진 줄
+                continue
@@ -1,25 +1,418 @@
 ﻿# app/services/loader.py
+from array import array
+from collections.abc import Iterable, Iterator, Sequence
+from contextlib import contextmanager
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-import json, random
+from itertools import islice
+import json, math, os, random, sqlite3
 
-def load_bank(json_dir: Path) -> list[dict]:
-    """폴더 내 JSON 파일을 읽어 문제은행 생성"""
+try:                        # 있으면 빠른 디코더 사용 (pip install orjson)
+    import orjson
+except ImportError:
+    orjson = None
+
+from app.models.question import Question
+from app.services.packbank import PACK_NAME, PackedBank, QuestionRef
+from app.services.sqlite_store import DB_NAME, SqliteBank
+from app.utils.cache import content_digest, read_pickle, write_pickle
+
+LOAD_WORKERS = 8                        # 파일 읽기 스레드 수
+PROCESS_MIN_BYTES = 4 * 1024 * 1024     # 이보다 큰 분할 파일은 별도 프로세스에서 디코딩 (코어 2개 이상일 때)
+
+# 스냅샷: JSON 폴더 안 .snapshot/ 에 분할 파일별 Question 목록을 pickle 로 저장
+#   index.pkl         파일명 → (size, mtime_ns, 내용 해시)
+#   shard-<해시>.pkl  그 내용의 Question 목록
+# size/mtime 이 같으면 JSON 을 열지 않고 재사용, 다르면 읽어서 해시가 같을 때만 재사용
+# → 바뀐 파일만 다시 파싱하고 그 파일 몫의 pickle 만 새로 씀
+SNAPSHOT_DIR = ".snapshot"
+SNAPSHOT_VERSION = 1
+
+def shard_manifest(json_dir: Path) -> list[tuple]:
+    """분할 파일 목록 [(이름, size, mtime_ns, 내용 해시)] (pack/DB 를 만들 때 같이 저장)"""
+    out = []
+    for f in sorted(json_dir.glob("Q*~Q*.json")):
+        st = f.stat()
+        out.append((f.name, st.st_size, st.st_mtime_ns, content_digest(f.read_bytes())))
+    return out
+
+def _is_fresh(manifest: list, files: list[Path]) -> bool:
+    """pack/DB 를 만들 때의 분할 파일 목록과 지금 폴더가 같은지.
+    파일이 빠지거나 늘었으면, 크기가 다르면 옛것. mtime 만 다르면(복사/복원) 내용 해시로 확인"""
+    known = {name: (size, mtime, digest) for name, size, mtime, digest in manifest}
+    if known.keys() != {f.name for f in files}:
+        return False
+    try:
+        for f in files:
+            size, mtime, digest = known[f.name]
+            st = f.stat()
+            if st.st_size != size:
+                return False
+            if st.st_mtime_ns != mtime and content_digest(f.read_bytes()) != digest:
+                return False
+    except OSError:
+        return False
+    return True
+
+def _decode(raw: bytes) -> list[dict]:
+    """분할 파일 바이트 → 보기/정답이 있는 문항 dict 목록 (프로세스 풀에서도 실행)"""
+    # orjson 은 bytes 를 바로 받음 (BOM/깨진 UTF-8 은 json 과 마찬가지로 예외)
+    data = orjson.loads(raw) if orjson is not None else json.loads(raw.decode("utf-8"))
+    if not isinstance(data, list):
+        return []
+    return [q for q in data if isinstance(q, dict) and q.get("choices") and q.get("answers")]
+
+def _read_shard(f: Path, procs, known: str | None):
+    """읽기 스레드: (해시, 파일 바이트 또는 큰 파일의 디코딩 Future).
+    해시가 스냅샷과 같으면 디코딩할 필요 없으므로 None"""
+    raw = f.read_bytes()
+    digest = content_digest(raw)
+    if digest == known:
+        return digest, None
+    if procs is not None and len(raw) >= PROCESS_MIN_BYTES:
+        return digest, procs.submit(_decode, raw)
+    return digest, raw
+
+def _to_questions(name: str, data: list[dict]) -> list[Question]:
+    qs = []
+    for q in data:
+        try:
+            qs.append(Question.from_dict(q))
+        except ValueError as e:
+            print(f"[WARN] {name} id={q.get('id')} 건너뜀: {e}")
+    return qs
+
+def _load_shards(todo: list, snap: Path, workers: int) -> dict:
+    """스냅샷으로 못 덮는 분할 파일들을 읽어서 {파일명: (size, mtime_ns, 해시, Question 목록)}.
+    todo 는 (파일, stat, 스냅샷에 있던 해시) 목록. 읽기 실패한 파일은 빠짐"""
+    # 파일은 스레드로 미리 읽어 두고, 큰 파일의 JSON 디코딩은 프로세스 풀로 넘김
+    # 작은 파일은 메인 스레드가 파일 순서대로 디코딩 (스레드끼리 GIL 경쟁 방지)
+    # → 문항 순서/경고 순서는 순차 로딩과 같음
+    workers = max(1, min(workers, len(todo)))
+    cpus = min(workers, os.cpu_count() or 1)
+    big = cpus > 1 and any(st.st_size >= PROCESS_MIN_BYTES for _, st, _ in todo)
+    procs = ProcessPoolExecutor(max_workers=cpus) if big else None
+    out = {}
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_read_shard, f, procs, known) for f, _, known in todo]
+            for (f, st, known), fut in zip(todo, futures):
+                try:
+                    digest, r = fut.result()
+                    qs = None
+                    if r is None:       # 내용 그대로 (mtime 만 바뀜)
+                        qs = read_pickle(snap / f"shard-{digest}.pkl")
+                        if qs is None:
+                            r = f.read_bytes()
+                    if qs is None:
+                        data = r.result() if isinstance(r, Future) else _decode(r)
+                except Exception as e:
+                    print(f"[WARN] {f.name} 읽기 실패: {e}")
+                    continue
+                if qs is None:
+                    qs = _to_questions(f.name, data)
+                    write_pickle(snap / f"shard-{digest}.pkl", qs)
+                out[f.name] = (st.st_size, st.st_mtime_ns, digest, qs)
+    finally:
+        if procs is not None:
+            procs.shutdown()
+    return out
+
+def _open_lazy(json_dir: Path, files: list[Path]):
+    """최신 bank.pack / bank.sqlite3 가 있으면 열어서 돌려줌 (본문은 읽을 때만), 없으면 None.
+    만들 때 저장한 분할 파일 목록과 지금 폴더가 다르면 옛것이므로 닫고 넘어감"""
+    for path, kind, errors in ((json_dir / PACK_NAME, PackedBank, (OSError, ValueError)),
+                               (json_dir / DB_NAME, SqliteBank, (sqlite3.Error, ValueError))):
+        if not path.exists():
+            continue
+        try:
+            bank = kind(path)
+        except errors as e:
+            print(f"[WARN] {path.name} 읽기 실패: {e}")
+            continue
+        try:
+            if _is_fresh(bank.shards(), files):
+                return bank
+        except errors as e:
+            print(f"[WARN] {path.name} 읽기 실패: {e}")
+        bank.close()
+    return None
+
+def load_bank(json_dir: Path, workers: int = LOAD_WORKERS) -> Sequence[Question]:
+    """폴더 내 JSON 파일을 읽어 문제은행 생성 (.snapshot/ 캐시로 바뀐 파일만 다시 파싱).
+    최신 bank.pack 이 있으면 mmap 으로 열고 문항 핸들(QuestionRef)만 돌려줌 (본문은 화면·채점에서 읽을 때 디코딩)
+    최신 bank.sqlite3 가 있으면 DB 를 열기만 하고 출제 때 뽑힌 문항만 조회"""
     files = sorted(json_dir.glob("Q*~Q*.json"))
-    bank = []
+    bank = _open_lazy(json_dir, files)
+    if bank is not None:
+        return bank
+
+    # 스냅샷에서 size/mtime 이 그대로인 파일은 재사용, 나머지만 다시 읽음
+    snap = json_dir / SNAPSHOT_DIR
+    index = read_pickle(snap / "index.pkl")
+    if not isinstance(index, dict) or index.get("version") != SNAPSHOT_VERSION:
+        index = {"version": SNAPSHOT_VERSION, "files": {}}
+    old = index["files"]
+    shards, todo = {}, []
     for f in files:
+        st = f.stat()
+        e = old.get(f.name)
+        if e is not None and e[:2] == (st.st_size, st.st_mtime_ns):
+            qs = read_pickle(snap / f"shard-{e[2]}.pkl")
+            if qs is not None:
+                shards[f.name] = (*e, qs)
+                continue
+        todo.append((f, st, e[2] if e is not None else None))
+    if todo:
+        shards.update(_load_shards(todo, snap, workers))
+
+    files_now = {name: e[:3] for name, e in shards.items()}
+    if files_now != old and write_pickle(snap / "index.pkl", {"version": SNAPSHOT_VERSION, "files": files_now}):
+        live = {f"shard-{e[2]}.pkl" for e in files_now.values()}
+        for p in snap.glob("shard-*.pkl"):
+            if p.name not in live:
+                p.unlink(missing_ok=True)
+    return [q for f in files if f.name in shards for q in shards[f.name][3]]
+
+@contextmanager
+def opened_bank(json_dir: Path, workers: int = LOAD_WORKERS):
+    """load_bank + 블록이 끝나면 pack/DB 닫기 (Windows 에서는 열려 있는 pack 을 parse_cbt 가 교체 못 함).
+    블록 밖에서 쓸 문항은 detach() 로 풀어 둠"""
+    bank = load_bank(json_dir, workers)
+    try:
+        yield bank
+    finally:
+        if isinstance(bank, (PackedBank, SqliteBank)):
+            bank.close()
+
+def detach(questions: Iterable) -> list[Question]:
+    """pack 문항 핸들(QuestionRef)을 디코딩된 Question 으로 (은행을 닫은 뒤에도 쓸 수 있게)"""
+    return [q.question() if isinstance(q, QuestionRef) else q for q in questions]
+
+def iter_bank(json_dir: Path) -> Iterator[Question]:
+    """분할 파일을 하나씩 읽으면서 문항을 흘려보냄 (메모리에는 파일 한 개 분량만).
+    스냅샷 조각이 최신이면 JSON 대신 그걸 읽음 (스냅샷은 읽기만 하고 갱신은 load_bank 몫)"""
+    snap = json_dir / SNAPSHOT_DIR
+    index = read_pickle(snap / "index.pkl")
+    old = index["files"] if isinstance(index, dict) and index.get("version") == SNAPSHOT_VERSION else {}
+    for f in sorted(json_dir.glob("Q*~Q*.json")):
+        e = old.get(f.name)
+        if e is not None:
+            st = f.stat()
+            if e[:2] == (st.st_size, st.st_mtime_ns):
+                qs = read_pickle(snap / f"shard-{e[2]}.pkl")
+                if qs is not None:
+                    yield from qs
+                    continue
         try:
-            data = json.loads(f.read_text(encoding="utf-8"))
-            if isinstance(data, list):
-                for q in data:
-                    if q.get("choices") and q.get("answers"):
-                        bank.append(q)
+            data = _decode(f.read_bytes())
         except Exception as e:
             print(f"[WARN] {f.name} 읽기 실패: {e}")
-    return bank
+            continue
+        yield from _to_questions(f.name, data)
+
+def _rand(rng: random.Random) -> float:
+    """(0, 1) 균등 난수 (log 에 넣으므로 0 제외)"""
+    u = rng.random()
+    while u == 0.0:
+        u = rng.random()
+    return u
+
+class _Reservoir:
+    """크기 k 저수지 (Algorithm L): 교체가 일어날 때만 난수를 뽑고 나머지는 건너뜀"""
+    __slots__ = ("k", "rng", "items", "w", "skip")
+
+    def __init__(self, k: int, rng: random.Random):
+        self.k, self.rng, self.items = k, rng, []
+        self.w = self.skip = 0
 
-def sample_questions(bank: list[dict], n: int, seed=None) -> list[dict]:
-    """무작위로 n개 문항 선택"""
+    def _next_skip(self):
+        self.w *= math.exp(math.log(_rand(self.rng)) / self.k)
+        if self.w >= 1.0:       # 반올림으로 1 이 된 경우: 바로 다음 항목
+            self.skip = 0
+        else:
+            self.skip = math.floor(math.log(_rand(self.rng)) / math.log1p(-self.w))
+
+    def offer(self, x):
+        if len(self.items) < self.k:
+            self.items.append(x)
+            if len(self.items) == self.k:
+                self.w = 1.0
+                self._next_skip()
+        elif self.skip:
+            self.skip -= 1
+        else:
+            self.items[self.rng.randrange(self.k)] = x
+            self._next_skip()
+
+    def feed(self, it: Iterator):
+        """스트림 전체를 넣음 (건너뛸 구간은 islice 로 한 번에 소비)"""
+        if self.k == 0:
+            return
+        for x in islice(it, self.k - len(self.items)):
+            self.offer(x)
+        while len(self.items) == self.k:
+            x = next(islice(it, self.skip, None), _END)
+            if x is _END:
+                return
+            self.skip = 0
+            self.offer(x)
+
+_END = object()
+
+def reservoir_sample(items: Iterable, n: int, seed=None, quotas: dict | None = None,
+                     key: str = "group") -> list:
+    """스트림에서 한 번 훑으며 무작위 n개 (전체를 리스트로 만들지 않음).
+    quotas={"part1": 40, "part2": 25} 처럼 주면 q[key] 값별로 그 개수씩 (합이 n 이어야 함)"""
+    rng = random.Random(seed)
+    if quotas is None:
+        res = _Reservoir(n, rng)
+        res.feed(iter(items))
+        if len(res.items) < n:
+            raise ValueError(f"문제은행 부족: {len(res.items)}개 (요청 {n})")
+        out = res.items
+    else:
+        if sum(quotas.values()) != n:
+            raise ValueError(f"그룹별 문항 수 합계({sum(quotas.values())})가 {n} 과 다름")
+        strata = {g: _Reservoir(k, rng) for g, k in quotas.items() if k > 0}
+        for q in items:
+            res = strata.get(q.get(key))
+            if res is not None:
+                res.offer(q)
+        short = {g: len(r.items) for g, r in strata.items() if len(r.items) < r.k}
+        if short:
+            raise ValueError("문제은행 부족: " + ", ".join(
+                f"{g} {got}개 (요청 {quotas[g]})" for g, got in short.items()))
+        out = [q for r in strata.values() for q in r.items]
+    rng.shuffle(out)
+    return out
+
+def sample_questions(bank: Iterable[Question], n: int, seed=None,
+                     quotas: dict | None = None) -> list[Question]:
+    """무작위로 n개 문항 선택.
+    리스트가 아닌 스트림(iter_bank 등)이나 그룹별 quotas 가 주어지면 저수지 샘플링으로 한 번만 훑음"""
+    if quotas is not None or not isinstance(bank, Sequence):
+        return reservoir_sample(bank, n, seed, quotas)
+    if isinstance(bank, SqliteBank):
+        return bank.sample(n, seed)
     rng = random.Random(seed)
     if len(bank) < n:
         raise ValueError(f"문제은행 부족: {len(bank)}개 (요청 {n})")
     return rng.sample(bank, n)
+
+def sample_from_dir(json_dir: Path, n: int, seed=None, quotas: dict | None = None) -> list[Question]:
+    """은행 전체를 메모리에 올리지 않고 JSON 폴더에서 바로 n문항 출제 (무작위 출제 모드용).
+    최신 pack/DB 가 있으면 그걸로(뽑힌 문항만 읽음), 없으면 분할 파일을 하나씩 흘려 읽으며 저수지 샘플링"""
+    bank = _open_lazy(json_dir, sorted(json_dir.glob("Q*~Q*.json")))
+    if bank is not None:
+        with bank:
+            return detach(sample_questions(bank, n, seed, quotas))
+    return sample_questions(iter_bank(json_dir), n, seed, quotas)
+
+# ---------- 오답률 가중 출제 ("약점" 모드) ----------
+# 문항마다 가중치(오답률) 비례 확률로 중복 없이 n개
+# - Walker/Vose alias 표를 은행 + 통계 스냅샷마다 한 번 만들고, 한 번 뽑기는 난수 2개로 O(1)
+# - 이미 뽑은 문항이 나오면 다시 뽑음. 계속 겹치면(뽑은 문항 비중이 큼) 남은 문항으로 표를 다시 만듦
+
+class AliasTable:
+    """가중치 비례 O(1) 뽑기 표 (Vose)"""
+    __slots__ = ("prob", "alias")
+
+    def __init__(self, weights: Sequence[float]):
+        n = len(weights)
+        total = math.fsum(weights)
+        if n == 0 or not total > 0:
+            raise ValueError("가중치 합이 0")
+        scaled = [w * n / total for w in weights]
+        self.prob = array("d", bytes(8 * n))
+        self.alias = array("I", bytes(4 * n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] += scaled[s] - 1.0
+            (small if scaled[l] < 1.0 else large).append(l)
+        for i in small + large:     # 남은 것은 부동소수 오차로 1 근처 → 자기 자신
+            self.prob[i] = 1.0
+            self.alias[i] = i
+
+    def __len__(self) -> int:
+        return len(self.prob)
+
+    def draw(self, rng: random.Random) -> int:
+        i = int(rng.random() * len(self.prob))
+        return i if rng.random() < self.prob[i] else self.alias[i]
+
+def bank_ids(bank) -> list[int]:
+    """은행의 문항 id 전체 (본문은 읽지 않음)"""
+    if isinstance(bank, SqliteBank):
+        return bank.ids()
+    if isinstance(bank, PackedBank):
+        return [bank.id_at(i) for i in range(len(bank))]
+    return [q["id"] for q in bank]
+
+def _weighted_positions(weights: Sequence[float], n: int, rng: random.Random,
+                        table: AliasTable | None = None) -> list[int]:
+    if len(weights) < n:
+        raise ValueError(f"문제은행 부족: {len(weights)}개 (요청 {n})")
+    table = table or AliasTable(weights)
+    index = None                    # 표를 다시 만들었으면 표 위치 → 원래 위치
+    out, taken, misses = [], set(), 0
+    while len(out) < n:
+        i = table.draw(rng)
+        if index is not None:
+            i = index[i]
+        if i not in taken:
+            taken.add(i)
+            out.append(i)
+            continue
+        misses += 1
+        if misses > 4 * n + 16:
+            index = [j for j, w in enumerate(weights) if w > 0 and j not in taken]
+            if len(index) < n - len(out):       # 가중치 0 인 문항만 남음
+                raise ValueError(f"문제은행 부족: 가중치가 있는 문항 {len(out) + len(index)}개 (요청 {n})")
+            table = AliasTable([weights[j] for j in index])
+            misses = 0
+    return out
+
+def _take(bank, ids: list[int], positions: list[int]) -> list[Question]:
+    if isinstance(bank, SqliteBank):
+        return bank.fetch([ids[i] for i in positions])
+    return [bank[i] for i in positions]
+
+def weighted_sample(bank: Sequence[Question], n: int, weights: Sequence[float], seed=None) -> list[Question]:
+    """weights[i] 에 비례하는 확률로 중복 없이 n개 (seed 가 같으면 같은 결과)"""
+    if len(weights) != len(bank):
+        raise ValueError(f"가중치 {len(weights)}개 != 문항 {len(bank)}개")
+    positions = _weighted_positions(weights, n, random.Random(seed))
+    ids = bank_ids(bank) if isinstance(bank, SqliteBank) else None
+    return _take(bank, ids, positions)
+
+def error_weights(ids: Iterable[int], stats: dict) -> list[float]:
+    """history 통계 → 문항별 오답률 (wrong + 1) / (attempts + 2). 처음 보는 문항은 0.5"""
+    qs = stats.get("questions", {})
+    out = []
+    for qid in ids:
+        s = qs.get(str(qid))
+        out.append(0.5 if s is None else (s["wrong"] + 1) / (s["attempts"] + 2))
+    return out
+
+class WeakSampler:
+    """오답률 가중 출제기. 은행 id/가중치/AliasTable 을 한 번 만들어 들고 있음
+    (여러 번 뽑을 쪽이 직접 들고 있다가, 통계가 바뀌면 새로 만듦)"""
+
+    def __init__(self, bank: Sequence[Question], stats: dict):
+        self.bank = bank
+        self.offset = stats.get("offset")       # 만들 때 반영된 history 위치
+        self.ids = bank_ids(bank)
+        self.weights = error_weights(self.ids, stats)
+        self.table = AliasTable(self.weights)
+
+    def sample(self, n: int, seed=None) -> list[Question]:
+        return _take(self.bank, self.ids, _weighted_positions(self.weights, n, random.Random(seed), self.table))
+
+def weak_sample(bank: Sequence[Question], n: int, stats: dict, seed=None) -> list[Question]:
+    """오답률 가중 출제. stats 는 history.load_stats() 결과 (한 번만 뽑을 때)"""
+    return WeakSampler(bank, stats).sample(n, seed)
@@ -0,0 +1,180 @@
+# app/services/packbank.py
+# 문제은행 단일 파일 포맷 (bank.pack)
+#
+#   [헤더 16B]  magic "CBTB" | version u16 | reserved u16 | count u32 | manifest 길이 u32
+#   [manifest]  UTF-8 JSON [[분할 파일 이름, size, mtime_ns, 내용 해시], ...]  ← 만들 때의 JSON 폴더 상태
+#   [인덱스]    count × (id i64, offset u64)   ← 저장한 순서 (JSON 분할 파일을 읽는 순서와 같게)
+#   [id 표]     count × (id i64, 위치 u32)      ← id 오름차순 (get_by_id 이분 탐색용)
+#   [레코드]    count × (length u32, UTF-8 JSON 문항)
+#
+# 문항 순서가 JSON 분할 파일 경로와 같아야 같은 seed 로 같은 문항이 뽑힘 → 정렬하지 않고 받은 순서 그대로 저장
+#
+# manifest 와 지금 폴더의 분할 파일이 다르면 loader 가 옛 pack 으로 보고 JSON 을 읽음
+#
+# 읽을 때는 mmap 으로 열고 헤더만 확인 → 문항은 접근할 때 해당 레코드만 디코딩
+# bank[i] 는 id + 위치만 든 QuestionRef 를 돌려주고, 본문은 처음 읽을 때 작은 LRU 로 가져옴
+import json, mmap, os, struct
+from collections import OrderedDict
+from collections.abc import Mapping, Sequence
+from pathlib import Path
+
+from app.models.question import Question
+
+PACK_NAME = "bank.pack"
+MAGIC = b"CBTB"
+VERSION = 3
+
+_HEADER = struct.Struct("<4sHHII")
+_ENTRY  = struct.Struct("<qQ")
+_BYID   = struct.Struct("<qI")
+_LEN    = struct.Struct("<I")
+
+CACHE_SIZE = 64     # 디코딩된 문항을 들고 있을 개수 (한 화면 + 검토창 정도)
+
+def write_pack(path: Path, items: list[dict], shards: list = ()):
+    """문항 목록을 pack 파일로 저장 (순서 유지, 임시 파일에 쓴 뒤 rename).
+    shards 는 loader.shard_manifest() 결과 (최신 여부 판단용)"""
+    records = [json.dumps(q, ensure_ascii=False, separators=(",", ":")).encode("utf-8") for q in items]
+    manifest = json.dumps([list(e) for e in shards], ensure_ascii=False).encode("utf-8")
+
+    index = bytearray()
+    offset = _HEADER.size + len(manifest) + (_ENTRY.size + _BYID.size) * len(items)
+    for q, rec in zip(items, records):
+        index += _ENTRY.pack(int(q["id"]), offset)
+        offset += _LEN.size + len(rec)
+    byid = b"".join(_BYID.pack(qid, i) for qid, i in sorted((int(q["id"]), i) for i, q in enumerate(items)))
+
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, 0, len(items), len(manifest)))
+        f.write(manifest)
+        f.write(index)
+        f.write(byid)
+        for rec in records:
+            f.write(_LEN.pack(len(rec)))
+            f.write(rec)
+    os.replace(tmp, path)
+
+class QuestionRef(Mapping):
+    """pack 안 문항 하나를 가리키는 핸들 (id + 위치).
+    dict 처럼 q["context"], q.get("explain") 로 읽으면 그때 레코드를 가져옴"""
+    __slots__ = ("_bank", "_i", "id")
+
+    def __init__(self, bank: "PackedBank", i: int, qid: int):
+        self._bank = bank
+        self._i = i
+        self.id = qid
+
+    def __getitem__(self, key):
+        if key == "id":
+            return self.id
+        return self._bank.fetch(self._i)[key]
+
+    @property
+    def answer_mask(self) -> int:
+        return self._bank.fetch(self._i).answer_mask
+
+    def __iter__(self):
+        return iter(self._bank.fetch(self._i))
+
+    def question(self) -> Question:
+        """디코딩된 Question (pack 을 닫은 뒤에도 쓸 수 있음)"""
+        return self._bank.fetch(self._i)
+
+    def __len__(self) -> int:
+        return len(self._bank.fetch(self._i))
+
+    def __repr__(self) -> str:
+        return f"QuestionRef(id={self.id})"
+
+class PackedBank(Sequence):
+    """pack 파일 위의 읽기 전용 문항 시퀀스 (저장한 순서)"""
+
+    def __init__(self, path: Path, cache_size: int = CACHE_SIZE):
+        self.path = Path(path)
+        self._lru = OrderedDict()
+        self._cache_size = cache_size
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, _, count, mlen = _HEADER.unpack_from(self._mm, 0)
+        except struct.error:
+            magic = version = None
+        if magic != MAGIC or version != VERSION:
+            self._mm.close()
+            raise ValueError(f"pack 형식 아님: {self.path.name}")
+        self._count = count
+        self._base = _HEADER.size + mlen    # 인덱스 시작
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _entry(self, i: int) -> tuple[int, int]:
+        return _ENTRY.unpack_from(self._mm, self._base + _ENTRY.size * i)
+
+    def id_at(self, i: int) -> int:
+        return self._entry(i)[0]
+
+    def record(self, i: int) -> dict:
+        """i번째 문항 디코딩"""
+        _, off = self._entry(i)
+        (n,) = _LEN.unpack_from(self._mm, off)
+        start = off + _LEN.size
+        return json.loads(self._mm[start:start + n])
+
+    def fetch(self, i: int) -> Question:
+        """i번째 문항 (최근 CACHE_SIZE 개는 디코딩 결과 재사용)"""
+        q = self._lru.get(i)
+        if q is not None:
+            self._lru.move_to_end(i)
+            return q
+        q = self._lru[i] = Question.from_dict(self.record(i))
+        if len(self._lru) > self._cache_size:
+            self._lru.popitem(last=False)
+        return q
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[k] for k in range(*i.indices(self._count))]
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        return QuestionRef(self, i, self.id_at(i))
+
+    def _byid(self, k: int) -> tuple[int, int]:
+        return _BYID.unpack_from(self._mm, self._base + _ENTRY.size * self._count + _BYID.size * k)
+
+    def find(self, qid: int) -> int:
+        """id → 위치 (id 표 이분 탐색), 없으면 -1"""
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._byid(mid)[0] < qid:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._count:
+            found, i = self._byid(lo)
+            if found == qid:
+                return i
+        return -1
+
+    def get_by_id(self, qid: int):
+        i = self.find(qid)
+        return self[i] if i >= 0 else None
+
+    def shards(self) -> list:
+        """만들 때의 분할 파일 목록 [(이름, size, mtime_ns, 내용 해시)]"""
+        raw = self._mm[_HEADER.size:self._base]
+        return [tuple(e) for e in json.loads(raw)] if raw else []
+
+    def close(self):
+        self._lru.clear()
+        self._mm.close()
+
+    def __enter__(self) -> "PackedBank":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
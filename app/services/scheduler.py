@@ -0,0 +1,279 @@
+# app/services/scheduler.py
+# 간격 반복(SM-2) 출제 일정
+#
+# - 채점 결과로 문항별 복습 간격/다음 출제 시각(due)을 갱신
+#     정답 → 간격을 늘림 (1일 → 6일 → 이전 간격 × ease), 오답 → 간격 초기화 후 RELEARN_SEC 뒤 다시 대상
+#     부분 점수는 그 회차를 부분 점수로 채점(PARTIAL_CREDIT)했을 때만 품질 점수에 반영 (아니면 틀리면 오답)
+#     ease 는 EASE_MIN~EASE_MAX 사이로 제한
+# - 행은 (due, id) 순으로 정렬해서 저장 (정렬된 배열 = 이미 힙 순서) → 읽은 뒤 heapify 없이 앞에서부터 꺼냄
+#   출제: due 가 지난 문항을 오래된 순으로 k개, 모자라면 처음 보는 문항을 무작위로, 그래도 모자라면 곧 due 될 문항
+#   id → 행은 id 순 행 번호 열(order) 이분 탐색. pack/DB 은행은 뽑힌 id 만 조회 → 출제는 O(k log n)
+#   (읽기 자체는 열마다 frombytes 한 번 = 바이트 복사 O(n). 메모리 리스트 은행은 id 찾기에 한 번 훑음)
+# - 상태는 JSON 폴더의 schedule.bin 에 열(column) 단위 고정 폭 배열로 저장
+#
+#   [헤더 12B]  magic "CBTS" | version u16 | reserved u16 | count u32
+#   [열]        id i64 (문자열 id 는 sched_key 로 만든 음수 키) | due u32 (유닉스 초) | interval u16 (일) | ease u16 (×1000) | reps u8
+#               | order u32 (id 오름차순 행 번호, version 2 부터)                      (각 count 개)
+import hashlib, os, random, struct, sys, time
+from array import array
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+
+from app.services.loader import bank_ids
+from app.services.packbank import PackedBank
+from app.services.sqlite_store import SqliteBank
+
+SCHEDULE_NAME = "schedule.bin"
+MAGIC = b"CBTS"
+VERSION = 2
+
+EASE_START = 2500       # SM-2 기본 ease 2.5 (×1000)
+EASE_MIN = 1300
+EASE_MAX = 5000         # 계속 맞혀도 간격이 한 번에 5배 넘게 늘지 않도록 (u16 열 넘침도 막음)
+MAX_INTERVAL_DAYS = 365
+RELEARN_SEC = 10 * 60   # 틀린 문항은 10분 뒤부터 다시 출제 대상
+DAY = 24 * 60 * 60
+
+_HEADER = struct.Struct("<4sHHI")
+_COLUMNS = (("ids", "q"), ("due", "I"), ("interval", "H"), ("ease", "H"), ("reps", "B"))
+_SWAP = sys.byteorder == "big"          # 파일은 little-endian
+_I64_MIN, _I64_MAX = -(1 << 63), (1 << 63) - 1
+
+def sched_key(qid) -> int:
+    """문항 id → 일정 열에 넣을 i64 키. 정수 id 는 그대로, 문자열 등은 blake2b 로 만든 음수 키
+    (README 상 id 는 문자열도 허용. 음수 정수 id 와 겹칠 일은 사실상 없음)"""
+    if type(qid) is int and _I64_MIN <= qid <= _I64_MAX:
+        return qid
+    h = int.from_bytes(hashlib.blake2b(str(qid).encode("utf-8"), digest_size=8).digest(), "little")
+    return -1 - (h >> 1)
+
+def _quality(row: dict, partial: bool = False) -> int:
+    """채점 행 → SM-2 품질 점수 (정답 5, 부분 점수 채점이면 비율대로 1~4, 아니면 틀린 문항은 2 이하 = 오답)"""
+    if row["correct"]:
+        return 5
+    q = max(1, round((row.get("credit") or 0) * 4))
+    return q if partial else min(q, 2)
+
+class _Source:
+    """출제에 필요한 만큼만 은행을 읽는 래퍼"""
+
+    def __init__(self, bank):
+        self.bank = bank
+        self._ids = None        # SqliteBank 위치 → id (처음 무작위로 고를 때 id 만 한 번)
+        self._by_id = None      # 메모리 리스트 은행 id → 문항 (처음 id 로 찾을 때 한 번)
+
+    def id_at(self, p: int) -> int:
+        if isinstance(self.bank, PackedBank):
+            return self.bank.id_at(p)
+        if isinstance(self.bank, SqliteBank):
+            if self._ids is None:
+                self._ids = self.bank.ids()
+            return self._ids[p]
+        return self.bank[p]["id"]
+
+    def at(self, positions: list[int]) -> list:
+        if isinstance(self.bank, SqliteBank):
+            return self.bank.fetch([self.id_at(p) for p in positions])
+        return [self.bank[p] for p in positions]
+
+    def find(self, qids: list[int]) -> dict:
+        """일정 키 목록 → {키: 문항} (은행에서 빠진 것은 없음. pack/DB 은행 id 는 정수라 키 = id)"""
+        if isinstance(self.bank, SqliteBank):
+            return {q.id: q for q in self.bank.fetch(qids)}
+        if isinstance(self.bank, PackedBank):
+            found = ((qid, self.bank.get_by_id(qid)) for qid in qids)
+            return {qid: q for qid, q in found if q is not None}
+        if self._by_id is None:
+            self._by_id = {q["id"]: q for q in self.bank}
+            if any(type(k) is not int or not _I64_MIN <= k <= _I64_MAX for k in self._by_id):   # 문자열 id 등
+                self._by_id = {sched_key(k): q for k, q in self._by_id.items()}
+        return {qid: self._by_id[qid] for qid in qids if qid in self._by_id}
+
+class Scheduler:
+    """문항별 (due, interval, ease, reps) 를 열 배열로 들고 있는 출제 일정 (행은 (due, id) 순)"""
+
+    def __init__(self):
+        self.ids = array("q")
+        self.due = array("I")
+        self.interval = array("H")
+        self.ease = array("H")
+        self.reps = array("B")
+        self.order = array("I")     # id 오름차순 행 번호
+        self._new = {}              # 읽은/정렬한 뒤 새로 추가된 id → 행 (order 에는 아직 없음)
+        self._sorted = True         # update 로 순서가 깨지면 False → 출제/저장 때 다시 정렬
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, qid) -> bool:
+        return self._row(sched_key(qid)) is not None
+
+    def _row(self, qid):
+        """일정 키 → 행 번호 (없으면 None)"""
+        i = self._new.get(qid)
+        if i is not None:
+            return i
+        k = bisect_left(self.order, qid, key=self.ids.__getitem__)
+        if k < len(self.order) and self.ids[self.order[k]] == qid:
+            return self.order[k]
+        return None
+
+    def _sort(self):
+        rows = sorted(range(len(self.ids)), key=lambda i: (self.due[i], self.ids[i]))
+        for name, code in _COLUMNS:
+            col = getattr(self, name)
+            setattr(self, name, array(code, [col[i] for i in rows]))
+        self.order = array("I", sorted(range(len(self.ids)), key=self.ids.__getitem__))
+        self._new.clear()
+        self._sorted = True
+
+    @classmethod
+    def load(cls, json_dir: Path) -> "Scheduler":
+        """schedule.bin 읽기 (없거나 깨졌으면 빈 일정)"""
+        path = json_dir / SCHEDULE_NAME
+        s = cls()
+        try:
+            raw = memoryview(path.read_bytes())
+        except FileNotFoundError:
+            return s
+        try:
+            magic, version, _, count = _HEADER.unpack_from(raw)
+            if magic != MAGIC or version not in (1, VERSION):
+                raise ValueError("형식 아님")
+            cols = [array(code) for _, code in _COLUMNS]
+            if version == VERSION:
+                cols.append(array("I"))
+            if len(raw) != _HEADER.size + count * sum(c.itemsize for c in cols):
+                raise ValueError("크기가 맞지 않음")
+            off = _HEADER.size
+            for c in cols:
+                c.frombytes(raw[off:off + count * c.itemsize])
+                off += count * c.itemsize
+                if _SWAP:
+                    c.byteswap()
+        except (struct.error, ValueError) as e:
+            print(f"[WARN] {path.name} 읽기 실패, 새 일정으로 시작: {e}")
+            return s
+        s.ids, s.due, s.interval, s.ease, s.reps = cols[:5]
+        if version == VERSION:
+            s.order = cols[5]
+        else:                   # version 1 은 정렬 없이 저장됨 → 한 번 정렬 (다음 저장부터 version 2)
+            s._sort()
+        return s
+
+    def save(self, json_dir: Path):
+        """schedule.bin 저장 (임시 파일에 쓴 뒤 rename)"""
+        if not self._sorted:
+            self._sort()
+        path = json_dir / SCHEDULE_NAME
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as fh:
+            fh.write(_HEADER.pack(MAGIC, VERSION, 0, len(self.ids)))
+            for col in [getattr(self, name) for name, _ in _COLUMNS] + [self.order]:
+                if _SWAP:
+                    col = array(col.typecode, col)
+                    col.byteswap()
+                col.tofile(fh)
+        os.replace(tmp, path)
+
+    def update(self, review: list[dict], now: float | None = None, partial: bool = False):
+        """채점 결과 반영 (grader.grade 의 review 행: id, correct, [credit]).
+        partial 은 그 회차를 부분 점수로 채점했는지 (grade 의 partial 과 같은 값)"""
+        now = int(time.time() if now is None else now)
+        for row in review:
+            qid = sched_key(row["id"])
+            i = self._row(qid)
+            if i is None:
+                i = self._new[qid] = len(self.ids)
+                self.ids.append(qid)
+                self.due.append(0)
+                self.interval.append(0)
+                self.ease.append(EASE_START)
+                self.reps.append(0)
+            q = _quality(row, partial)
+            self.ease[i] = min(EASE_MAX, max(EASE_MIN, self.ease[i] + 100 - (5 - q) * (80 + (5 - q) * 20)))
+            if q < 3:
+                self.reps[i] = 0
+                self.interval[i] = 0
+                self.due[i] = now + RELEARN_SEC
+            else:
+                reps = min(self.reps[i] + 1, 255)
+                if reps == 1:
+                    ivl = 1
+                elif reps == 2:
+                    ivl = 6
+                else:
+                    ivl = min(MAX_INTERVAL_DAYS, round(max(self.interval[i], 1) * self.ease[i] / 1000))
+                self.reps[i] = reps
+                self.interval[i] = ivl
+                self.due[i] = now + ivl * DAY
+            self._sorted = False
+
+    def due_count(self, now: float | None = None) -> int:
+        if not self._sorted:
+            self._sort()
+        return bisect_right(self.due, time.time() if now is None else now)
+
+    def pick(self, bank, n: int, now: float | None = None, seed=None) -> list:
+        """출제 n문항: due 지난 문항(오래된 순) → 처음 보는 문항(무작위) → 곧 due 될 문항.
+        문항 순서는 seed 로 섞음"""
+        if not self._sorted:
+            self._sort()
+        now = int(time.time() if now is None else now)
+        rng = random.Random(seed)
+        src = _Source(bank)
+        out, taken = [], set()
+        row = 0
+
+        def from_rows(until):
+            # 앞에서부터 모자란 만큼씩 꺼내 은행에서 찾음 (은행에서 빠진 문항은 건너뜀)
+            nonlocal row
+            while len(out) < n and row < len(self.ids) and self.due[row] <= until:
+                end = min(row + n - len(out), bisect_right(self.due, until, lo=row))
+                batch = self.ids[row:end].tolist()
+                row = end
+                found = src.find(batch)
+                for qid in batch:
+                    if qid in found:
+                        out.append(found[qid])
+                        taken.add(qid)
+
+        from_rows(now)
+        if len(out) < n:
+            self._fresh(src, n - len(out), rng, out, taken)
+        from_rows(float("inf"))
+
+        if len(out) < n:
+            raise ValueError(f"문제은행 부족: {len(out)}개 (요청 {n})")
+        rng.shuffle(out)
+        return out
+
+    def _fresh(self, src: _Source, need: int, rng: random.Random, out: list, taken: set):
+        """처음 보는 문항 need 개를 무작위로: 은행 위치를 뽑아 일정에 있으면 다시 뽑음.
+        자꾸 겹치면(은행 대부분을 이미 봄) 남은 id 를 한 번 훑어서 고름"""
+        size, misses, limit = len(src.bank), 0, 4 * need + 64
+        picked = []
+        while len(picked) < need and size and misses < limit:
+            p = rng.randrange(size)
+            qid = sched_key(src.id_at(p))
+            if qid in taken or self._row(qid) is not None:
+                misses += 1
+                continue
+            picked.append(p)
+            taken.add(qid)
+        out.extend(src.at(picked))
+        if misses >= limit:
+            keys = map(sched_key, bank_ids(src.bank))
+            fresh = [qid for qid in keys if qid not in taken and self._row(qid) is None]
+            chosen = rng.sample(fresh, min(need - len(picked), len(fresh)))
+            found = src.find(chosen)
+            out.extend(found[qid] for qid in chosen)
+            taken.update(chosen)
+
+def record_review(json_dir: Path, review: list[dict], now: float | None = None,
+                  partial: bool = False) -> Scheduler:
+    """채점 결과를 저장된 일정에 반영하고 저장"""
+    s = Scheduler.load(json_dir)
+    s.update(review, now, partial)
+    s.save(json_dir)
+    return s
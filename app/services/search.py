@@ -0,0 +1,244 @@
+# app/services/search.py
+# 문제은행 키워드 검색 (역색인 + BM25)
+# 사용법: python -m app.services.search [JSON_DIR] "질의" [--limit 20]
+#
+# - 토큰: 영문/숫자는 단어 단위(소문자), 한글은 글자 2-gram ("버킷을" → 버킷, 킷을)
+#   → 조사가 붙어도 "버킷" 으로 찾을 수 있음
+#   한 글자 한글 질의("람")는 그 글자가 들어간 2-gram 전부로 찾음
+# - 질의: 공백 = AND, OR = 또는, -단어 = 제외, "따옴표" = 구절 (단어 순서/인접까지 확인)
+#     예) Aurora "Global Database" -MySQL
+#         "S3 Object Lock" OR 객체잠금
+#   구절은 토큰으로 후보를 좁힌 뒤 후보 문항 본문에서 단어 순서를 확인 (조사가 붙은 끝 단어는 앞부분만 맞으면 됨)
+# - 결과: 조건을 만족하는 문항을 BM25 점수 순으로
+# - 색인은 JSON 폴더의 .snapshot/search.pkl 에 저장, 분할 파일이 그대로면 재사용
+import argparse, math, re
+from array import array
+from pathlib import Path
+
+from app.config import JSON_DIR
+from app.services.loader import SNAPSHOT_DIR, opened_bank
+from app.services.packbank import PACK_NAME
+from app.services.sqlite_store import DB_NAME
+from app.utils.cache import read_pickle, write_pickle
+
+INDEX_NAME = "search.pkl"
+INDEX_VERSION = 1
+FIELDS = ("title", "context", "choices", "explain")
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+RE_TOKEN = re.compile(r"[a-z0-9]+|[가-힣]+")
+RE_QUERY = re.compile(r'(-?)"([^"]*)"|(\S+)')
+
+def tokenize(text: str) -> list[str]:
+    out = []
+    for m in RE_TOKEN.finditer(text.lower()):
+        w = m.group()
+        if "가" <= w[0] <= "힣" and len(w) > 1:
+            out.extend(w[i:i + 2] for i in range(len(w) - 1))
+        else:
+            out.append(w)
+    return out
+
+def _is_syllable(t: str) -> bool:
+    return len(t) == 1 and "가" <= t <= "힣"
+
+def words(text: str) -> str:
+    """구절 확인용 단어열 (" aurora global database " 처럼 앞뒤 공백 포함)"""
+    return " " + " ".join(RE_TOKEN.findall(text.lower())) + " "
+
+def has_phrase(doc_words: str, phrase: str) -> bool:
+    """단어열에 구절이 단어 경계 그대로 있는지 (끝 단어가 한글이면 조사가 붙어도 됨)"""
+    if f" {phrase} " in doc_words:
+        return True
+    return "가" <= phrase[-1] <= "힣" and f" {phrase}" in doc_words
+
+def _doc_text(q) -> str:
+    parts = []
+    for k in FIELDS:
+        v = q.get(k)
+        if v:
+            parts.append(v if isinstance(v, str) else "\n".join(v))
+    return "\n".join(parts)
+
+def parse_query(query: str):
+    """질의 → (AND 절 목록, 제외 항목). 절 = OR 로 묶인 항목들.
+    항목 = (모두 포함해야 하는 토큰들, 구절 단어열 또는 None — 따옴표 안 단어가 둘 이상일 때만)"""
+    clauses, exclude = [], []
+    join_or = False
+    for m in RE_QUERY.finditer(query):
+        neg, quoted, word = m.group(1), m.group(2), m.group(3)
+        if word == "OR":
+            join_or = bool(clauses)
+            continue
+        if word is not None and word.startswith("-") and len(word) > 1:
+            neg, word = "-", word[1:]
+        toks = tokenize(quoted if word is None else word)
+        if not toks:
+            continue
+        phrase = None
+        if word is None and len(RE_TOKEN.findall(quoted.lower())) > 1:
+            phrase = words(quoted).strip()
+        item = (toks, phrase)
+        if neg:
+            exclude.append(item)
+        elif join_or:
+            clauses[-1].append(item)
+        else:
+            clauses.append([item])
+        join_or = False
+    return clauses, exclude
+
+class SearchIndex:
+    """문항 id 목록 + 토큰별 (문서 번호, 빈도) posting.
+    구절 확인에는 색인을 만든 은행(bank)이 필요 (build/load_index 가 붙여 줌, 저장은 안 함)"""
+
+    def __init__(self, ids: list, postings: dict, doc_len: array, bank=None):
+        self.ids = ids
+        self.postings = postings        # token → (array 문서 번호 오름차순, array 빈도)
+        self.doc_len = doc_len
+        self.avg_len = (sum(doc_len) / len(doc_len)) if doc_len else 0.0
+        self.bank = bank
+        self._syllables = None          # 한 글자 → 그 글자가 든 2-gram 토큰들 (처음 쓸 때 만듦)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["bank"] = state["_syllables"] = None
+        return state
+
+    def __setstate__(self, state):
+        state.setdefault("bank", None)
+        state.setdefault("_syllables", None)
+        self.__dict__.update(state)
+
+    @classmethod
+    def build(cls, bank) -> "SearchIndex":
+        ids, doc_len, postings = [], array("I"), {}
+        for d, q in enumerate(bank):
+            toks = tokenize(_doc_text(q))
+            ids.append(q["id"])
+            doc_len.append(len(toks))
+            tf = {}
+            for t in toks:
+                tf[t] = tf.get(t, 0) + 1
+            for t, n in tf.items():
+                p = postings.get(t)
+                if p is None:
+                    p = postings[t] = (array("I"), array("I"))
+                p[0].append(d)
+                p[1].append(n)
+        return cls(ids, postings, doc_len, bank)
+
+    def _expand(self, t: str) -> list[str]:
+        """질의 토큰 → 색인 토큰들 (한 글자 한글은 그 글자가 든 2-gram 전부)"""
+        if not _is_syllable(t):
+            return [t] if t in self.postings else []
+        if self._syllables is None:
+            syl = {}
+            for tok in self.postings:
+                if len(tok) == 2 and "가" <= tok[0] <= "힣":
+                    syl.setdefault(tok[0], []).append(tok)
+                    if tok[1] != tok[0]:
+                        syl.setdefault(tok[1], []).append(tok)
+            self._syllables = syl
+        return ([t] if t in self.postings else []) + self._syllables.get(t, [])
+
+    def _docs(self, item) -> set:
+        """항목을 만족하는 문서 번호 (토큰별 posting 을 짧은 것부터 교집합, 구절이면 본문 확인)"""
+        toks, phrase = item
+        lists = []
+        for t in toks:
+            terms = self._expand(t)
+            if not terms:
+                return set()
+            if len(terms) == 1:
+                lists.append(self.postings[terms[0]][0])
+            else:
+                lists.append(set().union(*(self.postings[x][0] for x in terms)))
+        lists.sort(key=len)
+        docs = set(lists[0])
+        for l in lists[1:]:
+            docs.intersection_update(l)
+            if not docs:
+                break
+        if phrase is not None and docs and self.bank is not None:
+            docs = {d for d in docs if has_phrase(words(_doc_text(self.bank[d])), phrase)}
+        return docs
+
+    def match(self, query: str) -> set:
+        """불리언 조건을 만족하는 문서 번호"""
+        clauses, exclude = parse_query(query)
+        if not clauses:
+            return set()
+        result = None
+        for alts in clauses:
+            docs = set().union(*(self._docs(item) for item in alts))
+            result = docs if result is None else result & docs
+            if not result:
+                return set()
+        for item in exclude:
+            result -= self._docs(item)
+        return result
+
+    def search_docs(self, query: str, limit: int = 20) -> list[tuple]:
+        """[(문서 번호, 점수), ...] BM25 점수 내림차순"""
+        docs = self.match(query)
+        if not docs:
+            return []
+        clauses, _ = parse_query(query)
+        terms = {x for alts in clauses for toks, _ in alts for t in toks for x in self._expand(t)}
+        n = len(self.ids)
+        scores = dict.fromkeys(docs, 0.0)
+        for t in terms:
+            p = self.postings.get(t)
+            if p is None:
+                continue
+            idf = math.log(1 + (n - len(p[0]) + 0.5) / (len(p[0]) + 0.5))
+            for d, tf in zip(*p):
+                if d in scores:
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_len[d] / self.avg_len)
+                    scores[d] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+        return sorted(scores.items(), key=lambda x: (-x[1], x[0]))[:limit]
+
+    def search(self, query: str, limit: int = 20) -> list[tuple]:
+        """[(문항 id, 점수), ...] BM25 점수 내림차순"""
+        return [(self.ids[d], s) for d, s in self.search_docs(query, limit)]
+
+def _bank_key(json_dir: Path) -> tuple:
+    """색인을 다시 만들어야 하는지 판단할 키 (문제은행 파일들의 이름/크기/mtime)"""
+    files = sorted(json_dir.glob("Q*~Q*.json"))
+    files += [p for p in (json_dir / PACK_NAME, json_dir / DB_NAME) if p.exists()]
+    return tuple((f.name, f.stat().st_size, f.stat().st_mtime_ns) for f in files)
+
+def load_index(json_dir: Path, bank) -> SearchIndex:
+    """저장된 색인이 지금 문제은행과 맞으면 읽고, 아니면 새로 만들어 저장"""
+    path = json_dir / SNAPSHOT_DIR / INDEX_NAME
+    key = _bank_key(json_dir)
+    saved = read_pickle(path)
+    if isinstance(saved, dict) and saved.get("version") == INDEX_VERSION and saved.get("key") == key:
+        index = saved["index"]
+        index.bank = bank
+        return index
+
+    index = SearchIndex.build(bank)
+    write_pickle(path, {"version": INDEX_VERSION, "key": key, "index": index})
+    return index
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="문제은행 키워드 검색")
+    ap.add_argument("json_dir", type=Path, nargs="?", default=JSON_DIR)
+    ap.add_argument("query", help='질의 (예: Aurora "Global Database" -MySQL)')
+    ap.add_argument("--limit", type=int, default=20)
+    args = ap.parse_args(argv)
+
+    with opened_bank(args.json_dir) as bank:
+        index = load_index(args.json_dir, bank)
+        hits = index.search_docs(args.query, args.limit)
+        print(f"[OK] {len(index.match(args.query))}건 중 상위 {len(hits)}건")
+        for d, score in hits:
+            q = bank[d]
+            title = " ".join((q.get("title") or q.get("context") or "").split())
+            print(f"  ID {index.ids[d]:>6} | {score:6.2f} | {title[:70]}")
+
+if __name__ == "__main__":
+    main()
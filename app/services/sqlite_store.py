@@ -0,0 +1,188 @@
+# app/services/sqlite_store.py
+# 문제은행 SQLite 저장소 (bank.sqlite3, 표준 라이브러리 sqlite3 만 사용)
+#
+#   questions      문항 1행 (정답은 비트마스크, links/추가 키는 JSON 문자열,
+#                  ord = 넣은 순서 = JSON 분할 파일을 읽는 순서 → 같은 seed 면 JSON/pack 과 같은 문항)
+#   choices        (qid, pos) → 보기 텍스트
+#   shards         만들 때의 JSON 분할 파일 목록 (이름, size, mtime_ns, 내용 해시) → loader 가 최신 여부 판단
+#   questions_fts  FTS5 전문 검색 (제목/지문/보기/해설, 내용은 저장 안 하고 rowid=qid 만)
+#
+# 시험 출제는 id 목록만 읽어 무작위로 고른 뒤 그 문항만 SELECT → 은행 전체를 메모리에 올리지 않음
+import json, os, random, sqlite3
+from collections.abc import Iterator, Sequence
+from pathlib import Path
+
+from app.models.question import Question
+
+DB_NAME = "bank.sqlite3"
+SCHEMA_VERSION = 3
+
+_SCHEMA = """
+CREATE TABLE questions (
+    id          INTEGER PRIMARY KEY,
+    grp         TEXT,
+    title       TEXT,
+    context     TEXT,
+    answer_mask INTEGER NOT NULL,
+    link        TEXT,
+    links       TEXT,
+    explain     TEXT,
+    extra       TEXT,
+    ord         INTEGER NOT NULL
+);
+CREATE UNIQUE INDEX questions_ord ON questions(ord);
+CREATE INDEX questions_grp ON questions(grp, ord);
+CREATE TABLE choices (
+    qid  INTEGER NOT NULL REFERENCES questions(id),
+    pos  INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    PRIMARY KEY (qid, pos)
+) WITHOUT ROWID;
+CREATE TABLE shards (
+    name     TEXT PRIMARY KEY,
+    size     INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest   TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+_FTS = "CREATE VIRTUAL TABLE questions_fts USING fts5(title, context, choices, explain, content='')"
+
+def _dumps(v):
+    return None if v is None else json.dumps(v, ensure_ascii=False)
+
+_COLS = "id, grp, title, context, answer_mask, link, links, explain, extra"
+
+def _row_question(row: tuple, choices) -> Question:
+    qid, grp, title, context, mask, link, links, explain, extra = row
+    return Question(qid, choices, mask, group=grp, title=title, context=context, link=link,
+                    links=json.loads(links) if links is not None else None,
+                    explain=explain, extra=json.loads(extra) if extra is not None else None)
+
+def write_store(path: Path, items: list[dict], shards: list = ()):
+    """문항 목록으로 DB 새로 만들기 (임시 파일에 쓴 뒤 rename).
+    순회/출제 순서는 items 순서 그대로 (JSON 과 맞추려면 parse_cbt.in_shard_order 순으로 넘김).
+    shards 는 loader.shard_manifest() 결과 (최신 여부 판단용)"""
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.unlink(missing_ok=True)
+    conn = sqlite3.connect(tmp)
+    try:
+        conn.executescript(_SCHEMA)
+        try:
+            conn.execute(_FTS)
+            fts = True
+        except sqlite3.OperationalError as e:   # FTS5 없이 빌드된 sqlite
+            print(f"[WARN] FTS5 사용 불가, 검색 색인 생략: {e}")
+            fts = False
+        qs = [q if isinstance(q, Question) else Question.from_dict(q) for q in items]
+        conn.executemany(
+            "INSERT INTO questions VALUES (?,?,?,?,?,?,?,?,?,?)",
+            ((int(q.id), q.group, q.title, q.context, q.answer_mask, q.link,
+              _dumps(list(q.links) if q.links is not None else None), q.explain, _dumps(q.extra), k)
+             for k, q in enumerate(qs)))
+        conn.executemany(
+            "INSERT INTO choices VALUES (?,?,?)",
+            ((int(q.id), pos, text) for q in qs for pos, text in enumerate(q.choices)))
+        if fts:
+            conn.executemany(
+                "INSERT INTO questions_fts(rowid, title, context, choices, explain) VALUES (?,?,?,?,?)",
+                ((int(q.id), q.title, q.context, "\n".join(q.choices), q.explain) for q in qs))
+        conn.executemany("INSERT INTO shards VALUES (?,?,?,?)", shards)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp, path)
+
+class SqliteBank(Sequence):
+    """bank.sqlite3 위의 읽기 전용 문항 시퀀스 (넣은 순서 = JSON 분할 파일 순서).
+    출제는 sample(), 검색은 search() 를 쓰고 인덱스 접근은 호환용.
+    전체 순회는 커서 하나로 흘려 읽음 (bank[i] 를 n번 부르지 않음)"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._conn = sqlite3.connect(f"{self.path.resolve().as_uri()}?mode=ro", uri=True)
+        (version,) = self._conn.execute("PRAGMA user_version").fetchone()
+        if version != SCHEMA_VERSION:
+            self._conn.close()
+            raise ValueError(f"DB 형식 아님: {self.path.name}")
+        (self._count,) = self._conn.execute("SELECT COUNT(*) FROM questions").fetchone()
+        self._ids = None        # 위치 → id (처음 인덱스 접근 때 한 번 읽음)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[k] for k in range(*i.indices(self._count))]
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        if self._ids is None:
+            self._ids = self.ids()
+        return self.fetch([self._ids[i]])[0]
+
+    def __iter__(self) -> Iterator[Question]:
+        """넣은 순서로 전체 문항 (문항/보기를 각각 ord 순 커서로 읽어 맞춤)"""
+        choices = self._conn.execute(
+            "SELECT q.ord, c.text FROM choices c JOIN questions q ON q.id = c.qid ORDER BY q.ord, c.pos")
+        pending = next(choices, None)
+        for row in self._conn.execute(f"SELECT ord, {_COLS} FROM questions ORDER BY ord"):
+            k, texts = row[0], []
+            while pending is not None and pending[0] <= k:
+                if pending[0] == k:
+                    texts.append(pending[1])
+                pending = next(choices, None)
+            yield _row_question(row[1:], texts)
+
+    def ids(self, group: str | None = None) -> list[int]:
+        if group is None:
+            rows = self._conn.execute("SELECT id FROM questions ORDER BY ord")
+        else:
+            rows = self._conn.execute("SELECT id FROM questions WHERE grp = ? ORDER BY ord", (group,))
+        return [r[0] for r in rows]
+
+    def fetch(self, ids: list[int]) -> list[Question]:
+        """id 목록 → Question 목록 (주어진 순서 유지, 없는 id 는 빠짐)"""
+        found = {}
+        for start in range(0, len(ids), 500):           # SQLite 변수 개수 제한
+            chunk = ids[start:start + 500]
+            marks = ",".join("?" * len(chunk))
+            choices = {}
+            for qid, text in self._conn.execute(
+                    f"SELECT qid, text FROM choices WHERE qid IN ({marks}) ORDER BY qid, pos", chunk):
+                choices.setdefault(qid, []).append(text)
+            for row in self._conn.execute(f"SELECT {_COLS} FROM questions WHERE id IN ({marks})", chunk):
+                found[row[0]] = _row_question(row, choices.get(row[0], ()))
+        return [found[i] for i in ids if i in found]
+
+    def get_by_id(self, qid: int):
+        qs = self.fetch([qid])
+        return qs[0] if qs else None
+
+    def sample(self, n: int, seed=None, group: str | None = None) -> list[Question]:
+        """무작위 n문항 (id 만 읽어서 고른 뒤 그 문항만 조회)"""
+        ids = self.ids(group)
+        if len(ids) < n:
+            raise ValueError(f"문제은행 부족: {len(ids)}개 (요청 {n})")
+        return self.fetch(random.Random(seed).sample(ids, n))
+
+    def search(self, query: str, limit: int = 20) -> list[Question]:
+        """FTS5 전문 검색 (MATCH 문법 그대로, 관련도 순)"""
+        rows = self._conn.execute(
+            "SELECT rowid FROM questions_fts WHERE questions_fts MATCH ? ORDER BY rank LIMIT ?",
+            (query, limit))
+        return self.fetch([r[0] for r in rows])
+
+    def shards(self) -> list:
+        """만들 때의 분할 파일 목록 [(이름, size, mtime_ns, 내용 해시)]"""
+        return self._conn.execute("SELECT name, size, mtime_ns, digest FROM shards ORDER BY name").fetchall()
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self) -> "SqliteBank":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
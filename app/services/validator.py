@@ -0,0 +1,160 @@
+# app/services/validator.py
+# 문제은행 일괄 검증 (분할 파일 전체를 한 번에 훑어 JSON 보고서 작성)
+# 사용법: python -m app.services.validator [JSON_DIR] [--out 보고서.json] [--jobs N]
+#
+# - 파일별 검사(형식/필드 타입/보기 개수/정답 레터 범위/링크 모양)는 프로세스 풀에서 병렬로
+# - 파일 간 검사(ID 중복)는 모은 결과로 한 번에
+# - 파일별 결과는 .snapshot/validate.pkl 에 내용 해시로 저장 → 바뀌지 않은 파일은 다시 검사하지 않음
+import argparse, json, os, re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from app.config import JSON_DIR
+from app.services.loader import SNAPSHOT_DIR
+from app.utils.cache import content_digest, read_pickle, write_pickle
+from app.utils.labels import LETTERS
+
+REPORT_NAME = "validation_report.json"
+CACHE_NAME = "validate.pkl"
+CACHE_VERSION = 1
+
+RE_LINK = re.compile(r"^https?://\S+$")
+_TEXT_FIELDS = ("title", "context", "explain", "group")
+
+def _issue(index, qid, code: str, message: str) -> dict:
+    return {"index": index, "id": qid, "code": code, "message": message}
+
+def check_question(q, index: int = None) -> list[dict]:
+    """문항 하나 검사 → 문제 목록 (없으면 빈 리스트)"""
+    if not isinstance(q, dict):
+        return [_issue(index, None, "not_an_object", f"문항이 객체가 아님: {type(q).__name__}")]
+    qid = q.get("id")
+    out = []
+    if qid is None:
+        out.append(_issue(index, qid, "missing_id", "id 없음"))
+    elif isinstance(qid, bool) or not isinstance(qid, (int, str)) or qid == "":
+        out.append(_issue(index, qid, "bad_id_type", f"id 는 숫자/문자열이어야 함: {qid!r}"))
+
+    for k in _TEXT_FIELDS:
+        if k in q and q[k] is not None and not isinstance(q[k], str):
+            out.append(_issue(index, qid, "bad_type", f"{k} 는 문자열이어야 함: {type(q[k]).__name__}"))
+
+    choices = q.get("choices")
+    if not isinstance(choices, list):
+        out.append(_issue(index, qid, "bad_type", f"choices 는 리스트여야 함: {type(choices).__name__}"))
+        choices = []
+    elif not 2 <= len(choices) <= len(LETTERS):
+        out.append(_issue(index, qid, "choice_count", f"보기 개수 {len(choices)} (2~{len(LETTERS)})"))
+    for i, c in enumerate(choices):
+        if not isinstance(c, str) or not c.strip():
+            out.append(_issue(index, qid, "empty_choice", f"{i + 1}번째 보기가 비었거나 문자열 아님"))
+
+    answers = q.get("answers")
+    if not isinstance(answers, list) or not answers:
+        out.append(_issue(index, qid, "no_answers", f"answers 가 비었거나 리스트 아님: {answers!r}"))
+    else:
+        if len(set(map(repr, answers))) != len(answers):
+            out.append(_issue(index, qid, "duplicate_answer", f"정답 중복: {answers}"))
+        valid = LETTERS[:len(choices)]
+        for a in answers:
+            if not isinstance(a, str) or len(a) != 1 or a not in LETTERS:
+                out.append(_issue(index, qid, "bad_answer_letter", f"정답 레터 아님: {a!r}"))
+            elif a not in valid:
+                out.append(_issue(index, qid, "answer_out_of_range",
+                                  f"정답 {a} 가 보기 {len(choices)}개 범위 밖"))
+
+    link = q.get("link")
+    if link is not None and not (isinstance(link, str) and RE_LINK.match(link)):
+        out.append(_issue(index, qid, "bad_link", f"link 형식 오류: {link!r}"))
+    links = q.get("links")
+    if links is not None:
+        if not isinstance(links, list):
+            out.append(_issue(index, qid, "bad_type", f"links 는 리스트여야 함: {type(links).__name__}"))
+        else:
+            for u in links:
+                if not (isinstance(u, str) and RE_LINK.match(u)):
+                    out.append(_issue(index, qid, "bad_link", f"links 항목 형식 오류: {u!r}"))
+    return out
+
+def check_shard(raw: bytes) -> tuple[list[dict], list[tuple]]:
+    """분할 파일 하나 검사 → (문제 목록, [(index, id), ...]) (프로세스 풀에서 실행)"""
+    try:
+        data = orjson.loads(raw) if orjson is not None else json.loads(raw.decode("utf-8"))
+    except Exception as e:
+        return [_issue(None, None, "shard_unreadable", str(e))], []
+    if not isinstance(data, list):
+        return [_issue(None, None, "not_a_list", f"최상위가 리스트가 아님: {type(data).__name__}")], []
+    issues, ids = [], []
+    for i, q in enumerate(data):
+        issues.extend(check_question(q, i))
+        if isinstance(q, dict) and isinstance(q.get("id"), (int, str)) and not isinstance(q["id"], bool):
+            ids.append((i, q["id"]))
+    return issues, ids
+
+def validate_bank(json_dir: Path, jobs: int = 0) -> dict:
+    """분할 파일 전체 검사 → 보고서 dict"""
+    files = sorted(json_dir.glob("Q*~Q*.json"))
+    cache_path = json_dir / SNAPSHOT_DIR / CACHE_NAME
+    cache = read_pickle(cache_path)
+    if not isinstance(cache, dict) or cache.get("version") != CACHE_VERSION:
+        cache = {"version": CACHE_VERSION, "results": {}}
+    old = cache["results"]
+
+    digests, todo = {}, []
+    for f in files:
+        raw = f.read_bytes()
+        digests[f.name] = d = content_digest(raw)
+        if d not in old:
+            todo.append((d, raw))
+
+    results = {d: old[d] for d in digests.values() if d in old}
+    if todo:
+        jobs = jobs or (os.cpu_count() or 1)
+        if jobs > 1 and len(todo) > 1:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                checked = list(pool.map(check_shard, [raw for _, raw in todo], chunksize=8))
+        else:
+            checked = [check_shard(raw) for _, raw in todo]
+        results.update((d, r) for (d, _), r in zip(todo, checked))
+    if results.keys() != old.keys():
+        write_pickle(cache_path, {"version": CACHE_VERSION, "results": results})
+
+    errors, seen, n_questions = [], {}, 0
+    for f in files:
+        issues, ids = results[digests[f.name]]
+        errors.extend(dict(e, shard=f.name) for e in issues)
+        n_questions += len(ids)
+        for i, qid in ids:
+            first = seen.setdefault(qid, (f.name, i))
+            if first != (f.name, i):
+                errors.append(dict(_issue(i, qid, "duplicate_id", f"id 중복 (처음: {first[0]} #{first[1]})"),
+                                   shard=f.name, first={"shard": first[0], "index": first[1]}))
+    return {
+        "json_dir": str(json_dir),
+        "shards": len(files),
+        "questions": n_questions,
+        "checked": len(todo),
+        "error_count": len(errors),
+        "errors": errors,
+    }
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="문제은행 JSON 일괄 검증")
+    ap.add_argument("json_dir", type=Path, nargs="?", default=JSON_DIR)
+    ap.add_argument("--out", type=Path, default=None, help=f"보고서 경로 (기본: JSON_DIR/{REPORT_NAME})")
+    ap.add_argument("--jobs", type=int, default=0, help="검사 프로세스 수 (0 = CPU 코어 수)")
+    args = ap.parse_args(argv)
+
+    report = validate_bank(args.json_dir, args.jobs)
+    out = args.out or args.json_dir / REPORT_NAME
+    out.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"[OK] 파일 {report['shards']}개 / 문항 {report['questions']}개 "
+          f"(새로 검사 {report['checked']}개 파일) | 오류 {report['error_count']}건 | 보고서={out}")
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 import tkinter as tk
 from tkinter import messagebox
+import time
 import webbrowser
 
 from app.config import (
@@ -9,10 +10,14 @@ from app.config import (
     SAFE_CUTOFF,
     PERF_CUTOFF,
     DEFAULT_TIMER_MIN,
+    PARTIAL_CREDIT,
+    EXAM_MODE,
 )
-from app.services.loader import load_bank, sample_questions
+from app.services.loader import detach, opened_bank, sample_from_dir, weak_sample
 from app.services.grader import grade, multi_required
-from app.utils.labels import LETTERS, labels_for_choices
+from app.services.history import load_stats, record_session
+from app.services.scheduler import Scheduler, record_review
+from app.utils.labels import labels_for_choices, mask_to_letters
 
 
 # ===== 공통 스타일 =====
@@ -54,21 +59,32 @@ class QuizApp(tk.Tk):
         # ------------------------
         # 데이터 로딩
         # ------------------------
-        self.bank = load_bank(JSON_DIR)
-        if len(self.bank) < NUM_QUESTIONS:
-            messagebox.showerror("오류", f"문제은행이 부족합니다. ({len(self.bank)}개)")
+        # 무작위 출제는 은행 전체를 올리지 않고 폴더에서 바로 뽑음, 복습/약점 모드는 전체 id 가 필요해서 load_bank
+        # (뽑은 문항만 풀어 두고 pack/DB 는 바로 닫음 → 앱이 떠 있어도 parse_cbt 가 pack 을 교체할 수 있음)
+        try:
+            if EXAM_MODE == "review":
+                with opened_bank(JSON_DIR) as bank:
+                    self.run = detach(Scheduler.load(JSON_DIR).pick(bank, NUM_QUESTIONS))
+            elif EXAM_MODE == "weak":
+                with opened_bank(JSON_DIR) as bank:
+                    self.run = detach(weak_sample(bank, NUM_QUESTIONS, load_stats(JSON_DIR)))
+            else:
+                self.run = sample_from_dir(JSON_DIR, NUM_QUESTIONS)
+        except ValueError as e:     # 문제은행 부족
+            messagebox.showerror("오류", str(e))
             self.destroy()
             return
-        self.run = sample_questions(self.bank, NUM_QUESTIONS)
 
         # ------------------------
         # 상태값
         # ------------------------
         self.index = 0  # 현재 문제 idx
-        self.selected = {q["id"]: set() for q in self.run}  # 사용자가 고른 보기들
+        self.selected = {q["id"]: 0 for q in self.run}  # 사용자가 고른 보기들 (A=bit0 비트마스크)
         self.marked = set()     # 마크(★)된 문제 id
         self.wrong_ids = set()  # 제출 후 틀린 문제 id
         self.review_win = None  # 제출 후 검토창 핸들
+        self.started_at = time.monotonic()  # 응시 기록용 (타이머가 꺼져 있어도 잼)
+        self.recorded = False   # 같은 세션을 두 번 기록하지 않도록 (재제출)
 
         # 타이머 (카운트다운)
         self.start_total_seconds = (
@@ -273,7 +289,7 @@ class QuizApp(tk.Tk):
             row.pack(fill=tk.X, anchor="w", pady=4)
 
             var = tk.BooleanVar(
-                value=(LETTERS[i] in self.selected[q["id"]])
+                value=bool(self.selected[q["id"]] >> i & 1)
             )
             self.choice_vars.append((labels[i], var))
 
@@ -307,13 +323,11 @@ class QuizApp(tk.Tk):
 
     def _on_choice_change(self):
         q = self.run[self.index]
-        picked = {
-            lbl for (lbl, v) in self.choice_vars if v.get()
-        }
-        # 정렬 유지 (A,B,C...)
-        self.selected[q["id"]] = set(
-            sorted(picked, key=lambda x: LETTERS.index(x))
-        )
+        mask = 0
+        for i, (_, v) in enumerate(self.choice_vars):
+            if v.get():
+                mask |= 1 << i
+        self.selected[q["id"]] = mask
 
     # ------------------------------------------------------------------
     # 타이머
@@ -347,7 +361,7 @@ class QuizApp(tk.Tk):
         picked = self.selected[q["id"]]
 
         # 복수 정답 문제인데 1개만 찍은 상태로 넘어가려 하면 막기
-        if multi_required(q) and len(picked) == 1:
+        if multi_required(q) and picked.bit_count() == 1:
             messagebox.showwarning(
                 "안내", "복수 정답 문제입니다. 다시 선택해주세요."
             )
@@ -467,7 +481,7 @@ class QuizApp(tk.Tk):
         # 복수정답인데 1개만 찍은 문제들 경고
         pending = []
         for q in self.run:
-            if multi_required(q) and len(self.selected[q["id"]]) == 1:
+            if multi_required(q) and self.selected[q["id"]].bit_count() == 1:
                 pending.append(q["id"])
         if pending:
             ok = messagebox.askyesno(
@@ -479,7 +493,7 @@ class QuizApp(tk.Tk):
             if not ok:
                 return
 
-        correct, review = grade(self.run, self.selected)
+        correct, review = grade(self.run, self.selected, partial=PARTIAL_CREDIT)
 
         # 응시 시간 계산
         if self.start_total_seconds is None:
@@ -491,6 +505,19 @@ class QuizApp(tk.Tk):
             m, s = divmod(used, 60)
             used_display = f"{m}분 {s:02d}초"
 
+        if not self.recorded:
+            try:
+                record_session(JSON_DIR, self.run, self.selected, review, correct,
+                               time.monotonic() - self.started_at, source="gui")
+                self.recorded = True
+            except OSError as e:
+                print(f"[WARN] 응시 기록 저장 실패: {e}")
+            if self.recorded:
+                try:                    # 일정 저장이 실패해도 결과 화면은 띄움
+                    record_review(JSON_DIR, review, partial=PARTIAL_CREDIT)
+                except Exception as e:
+                    print(f"[WARN] 복습 일정 저장 실패: {e}")
+
         self._show_result(correct, review, used_display)
 
     def _show_result(self, correct, review, used_time_text):
@@ -553,7 +580,7 @@ class QuizApp(tk.Tk):
         tk.Label(
             topbar,
             text=(
-                f"  맞힌 문제 수: {correct}   "
+                f"  맞힌 문제 수: {correct:g}   "
                 f"합불 여부: {status_text}   "
                 f"검토 화면, 응시 시간:{used_time_text}"
             ),
@@ -705,8 +732,8 @@ class QuizApp(tk.Tk):
             etext.delete("1.0", tk.END)
 
             # 정답 / 내가 제출한 답
-            correct_letters = review[curr_index]["answer"]  # ["A","D",...]
-            user_letters    = review[curr_index]["user"]    # ["B","C",...]
+            correct_letters = mask_to_letters(review[curr_index]["answer_mask"])  # ["A","D",...]
+            user_letters    = mask_to_letters(review[curr_index]["user_mask"])    # ["B","C",...]
 
             # 보기 맵핑 { "A": "보기텍스트 전체", ... }
             choice_map = {}
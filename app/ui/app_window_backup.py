@@ -3,9 +3,9 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 
 from app.config import JSON_DIR, NUM_QUESTIONS, PASS_CUTOFF, SAFE_CUTOFF, PERF_CUTOFF, DEFAULT_TIMER_MIN
-from app.services.loader import load_bank, sample_questions
+from app.services.loader import detach, opened_bank, sample_questions
 from app.services.grader import grade, status_from_score, multi_required
-from app.utils.labels import LETTERS
+from app.utils.labels import LETTERS, mask_to_letters
 
 from app.ui.views.exam_view import ExamView
 from app.ui.widgets.qgrid import QGrid
@@ -25,11 +25,11 @@ class QuizApp(tk.Tk):
         self.configure(bg=COLOR_BG)
 
         # 데이터
-        self.bank = load_bank(JSON_DIR)
-        if len(self.bank) < NUM_QUESTIONS:
-            messagebox.showerror("오류", f"문제은행이 부족합니다. ({len(self.bank)}개)")
-            self.destroy(); return
-        self.run = sample_questions(self.bank, NUM_QUESTIONS)
+        with opened_bank(JSON_DIR) as bank:
+            if len(bank) < NUM_QUESTIONS:
+                messagebox.showerror("오류", f"문제은행이 부족합니다. ({len(bank)}개)")
+                self.destroy(); return
+            self.run = detach(sample_questions(bank, NUM_QUESTIONS))
 
         # 상태
         self.index = 0
@@ -376,8 +376,8 @@ class QuizApp(tk.Tk):
             etext.config(state=tk.NORMAL)
             etext.delete("1.0", tk.END)
 
-            my_answers = review[curr_index]["user"]     # 내가 고른 선택지들 (["A","C"] 등)
-            correct_ans = review[curr_index]["answer"]  # 정답 선택지들
+            my_answers = mask_to_letters(review[curr_index]["user_mask"])     # 내가 고른 선택지들 (["A","C"] 등)
+            correct_ans = mask_to_letters(review[curr_index]["answer_mask"])  # 정답 선택지들
 
             ansline = (
                 f"정답: {','.join(correct_ans) or '-'}"
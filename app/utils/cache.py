@@ -0,0 +1,33 @@
+# app/utils/cache.py
+# JSON 폴더 .snapshot/ 캐시 파일 공용 함수 (loader 스냅샷, validator 결과, 검색 색인)
+# 캐시는 없거나 깨져도 다시 만들면 되므로 실패는 경고만 하고 넘어감
+import hashlib, os, pickle
+from pathlib import Path
+
+def content_digest(raw: bytes) -> str:
+    """파일 내용 해시 (캐시 키)"""
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+def read_pickle(path: Path):
+    """캐시 파일 읽기. 없거나 깨졌으면 None (호출한 쪽에서 다시 만듦)"""
+    try:
+        with open(path, "rb") as fh:
+            return pickle.load(fh)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"[WARN] {path.name} 읽기 실패: {e}")
+        return None
+
+def write_pickle(path: Path, obj) -> bool:
+    """캐시 파일 저장 (임시 파일에 쓴 뒤 rename). 실패하면 False"""
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        path.parent.mkdir(exist_ok=True)
+        with open(tmp, "wb") as fh:
+            pickle.dump(obj, fh, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        return True
+    except OSError as e:      # 읽기 전용 폴더 등: 다음 실행 때 다시 만들 뿐
+        print(f"[WARN] {path.name} 저장 실패: {e}")
+        return False
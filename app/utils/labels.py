@@ -22,3 +22,16 @@ def normalize_user_answer(s: str, max_labels: int) -> list[str]:
         elif ch in map_num and map_num[ch] in allowed:
             out.append(map_num[ch])
     return sorted(set(out), key=lambda x: LETTERS.index(x))
+
+def letters_to_mask(letters) -> int:
+    """['A','C'] → 0b101 (A가 최하위 비트)"""
+    mask = 0
+    for ch in letters:
+        if len(ch) != 1 or ch not in LETTERS:
+            raise ValueError(f"보기 레터 아님: {ch!r}")
+        mask |= 1 << LETTERS.index(ch)
+    return mask
+
+def mask_to_letters(mask: int) -> list[str]:
+    """0b101 → ['A','C']"""
+    return [LETTERS[i] for i in range(mask.bit_length()) if mask >> i & 1]
@@ -0,0 +1,747 @@
+# bench.py
+# 성능 측정용 스크립트 (정리/파싱 단계 변경 전후 비교)
+# 사용법: python bench.py clean [--mb 100]
+#         python bench.py join  [--fragments 10000] [--blocks 5]
+#         python bench.py parse [--mb 20]
+#         python bench.py answer [--n 200000] [--no-verify]
+#         python bench.py model [--n 50000]
+#         python bench.py load  [--shards 10,100,1000] [--n 50000]
+#         python bench.py search [--n 10000]
+#         python bench.py sample [--sizes 5000,20000,50000]
+#         python bench.py dedup [--n 5000] [--verify 1500]
+#         python bench.py validate [--shards 1000] [--n 50000]
+#         python bench.py grade [--rounds 20000]
+#         python bench.py batch [--sheets 100000]
+#         python bench.py schedule [--n 50000]
+#         python bench.py weak [--n 50000]
+#         python bench.py pagecache
+#
+# - 합성 데이터: 실제 덤프와 비슷한 Q블록(지문/보기/정답/설명/끊긴 URL)을 반복 생성
+# - "before"는 이전 구현(정규식 여러 개를 줄마다 순서대로 시도)을 그대로 옮겨 둔 것
+# - 두 구현의 출력이 같은지도 함께 확인
+
+import argparse, gc, json, os, pickle, random, re, tempfile, time, tracemalloc
+from pathlib import Path
+
+import clean_lines, dedup, parse_cbt
+from app.models.question import Question
+from app.services import grader, loader, packbank, scheduler, search, validator
+from app.utils.labels import LETTERS, letters_to_mask, mask_to_letters
+
+# ---------- 합성 데이터 ----------
+
+_WORDS = ("Amazon S3 버킷 에 저장 된 데이터 를 암호화 해야 합니다. 솔루션 아키텍트 는 무엇 을 해야 합니까? "
+          "Aurora Global Database Lambda EC2 인스턴스 VPC 엔드포인트 CloudFront 배포 Object Lock 요. 다. "
+          "함. it is fine. really? 123 4.5 (a) ).").split()
+
+def _sentence(rng, lo=3, hi=14):
+    return " ".join(rng.choice(_WORDS) for _ in range(rng.randint(lo, hi)))
+
+def _block(rng, qn: int) -> list[str]:
+    out = [f"Q{qn}", _sentence(rng)]
+    for _ in range(rng.randint(1, 4)):
+        out.append(_sentence(rng))
+    for label in "ABCDE"[: rng.randint(2, 5)]:
+        out.append(f"{label}. {_sentence(rng)}")
+        if rng.random() < 0.3:
+            out.append(_sentence(rng))
+    out.append("Answer: " + rng.choice(["A", "B,D", "AC", "①③", "2"]))
+    out.append("설명: " + _sentence(rng))
+    out += [_sentence(rng) for _ in range(rng.randint(0, 3))]
+    if rng.random() < 0.5:
+        out += ["https://docs.aws.amazon.com/Amazon", "S3/latest/user guide/", "", "84973-abc", "utions.html"]
+    out.append("")
+    return out
+
+def synthetic_lines(mb: float, seed: int = 0) -> list[str]:
+    """약 mb 메가바이트(UTF-8 기준) 분량의 추출 텍스트 줄 목록"""
+    rng = random.Random(seed)
+    pool = [_block(rng, i + 1) for i in range(500)]
+    target = int(mb * 1024 * 1024)
+    lines, size, i = [], 0, 0
+    while size < target:
+        blk = pool[i % len(pool)]
+        lines += blk
+        size += sum(len(ln.encode("utf-8")) + 1 for ln in blk)
+        i += 1
+    return lines
+
+# ---------- 이전 구현 (비교 기준) ----------
+
+def _legacy_is_choice_head(s):
+    return bool(clean_lines.RE_CHOICE_ALPHA.match(s) or clean_lines.RE_CHOICE_NUM.match(s)
+                or clean_lines.RE_CHOICE_CIRC.match(s) or clean_lines.RE_CHOICE_KOR.match(s))
+
+def _legacy_is_border_line(s):
+    if not s.strip():
+        return False
+    return bool(clean_lines.RE_Q.match(s) or _legacy_is_choice_head(s) or clean_lines.RE_ANSWER.match(s)
+                or clean_lines.RE_EXPL.match(s) or clean_lines.RE_LINK.match(s))
+
+def _legacy_merge_url_wraps(lines):
+    out, i, N = [], 0, len(lines)
+    while i < N:
+        cur = lines[i].rstrip("\n")
+        if clean_lines.RE_LINK.match(cur.strip()):
+            buf = cur.replace(" ", "").replace("\t", "").replace("\u00A0", "").strip()
+            j = i + 1
+            while j < N:
+                nxt = (lines[j] or "").strip()
+                if _legacy_is_border_line(nxt):
+                    break
+                if clean_lines._looks_like_url_continuation(nxt):
+                    buf += nxt.replace(" ", "").replace("\t", "").replace("\u00A0", "")
+                    j += 1
+                    continue
+                break
+            out.append(buf)
+            i = j
+        else:
+            out.append(cur)
+            i += 1
+    return out
+
+def _legacy_join_lines(lines):
+    lines = _legacy_merge_url_wraps([ln.rstrip() for ln in lines])
+    out, buf = [], ""
+    for ln in lines:
+        s = ln.strip()
+        if not s:
+            if buf.strip():
+                out.append(buf.strip())
+            buf = ""
+            continue
+        if _legacy_is_border_line(s):
+            if buf.strip():
+                out.append(buf.strip())
+            buf = ""
+            out.append(s)
+            continue
+        if out and _legacy_is_choice_head(out[-1]):
+            out[-1] = (out[-1] + " " + s).strip()
+            continue
+        if not buf:
+            buf = s
+        elif not buf.endswith(clean_lines.ENDMARK):
+            buf += " " + s
+        else:
+            if buf.strip():
+                out.append(buf.strip())
+            buf = s
+    if buf.strip():
+        out.append(buf.strip())
+    return out
+
+_RE_QLINE = re.compile(r"^\s*Q\s*(\d{1,4})\s*(.*)$", re.M)
+
+def _legacy_parse_one(raw_text, group):
+    pc = parse_cbt
+    joined = "\n".join(ln.rstrip() for ln in raw_text.splitlines())
+    matches = list(_RE_QLINE.finditer(joined))
+    items = []
+    for idx, m in enumerate(matches):
+        qn = int(m.group(1))
+        inline = m.group(2).strip()
+        start = m.end()
+        end = matches[idx+1].start() if idx+1 < len(matches) else len(joined)
+        body = [inline] if inline else []
+        if start < end:
+            body += joined[start:end].splitlines()
+        title, context, choices, ans_pos, links, explain = "", [], [], [], [], []
+        for ln in body:
+            s = ln.strip()
+            if not s:
+                continue
+            ma = pc.RE_ANS.match(s)
+            if ma:
+                ans_pos += _legacy_parse_answer_positions(ma.group(1))
+                continue
+            me = pc.RE_EXPL.match(s)
+            if me:
+                if me.group(1).strip():
+                    explain.append(me.group(1).strip())
+                continue
+            if pc.RE_LINK.match(s):
+                links.append(s)
+                if explain and not explain[-1].endswith(s):
+                    explain.append(s)
+                continue
+            mc = (pc.RE_CHOICE_ALPHA.match(s) or pc.RE_CHOICE_NUM.match(s) or
+                  pc.RE_CHOICE_CIRC.match(s) or pc.RE_CHOICE_KOR.match(s))
+            if mc:
+                if mc.groups()[-1].strip():
+                    choices.append(mc.groups()[-1].strip())
+                continue
+            if not title:
+                title = s
+            else:
+                context.append(s)
+        if len(choices) < 2 or len(ans_pos) < 1:
+            continue
+        ans = sorted({pc.LETTERS[p-1] for p in ans_pos if 1 <= p <= len(choices) and p <= 26},
+                     key=pc.LETTERS.index)
+        if not ans:
+            continue
+        obj = {"id": pc._normalize_id(group, qn),
+               "group": ("new" if (group == "part2" and 1 <= qn <= 99) else group),
+               "title": title.strip(), "context": " ".join(context).strip(),
+               "choices": choices, "answers": ans}
+        if links:
+            obj["link"], obj["links"] = links[0], links
+        if explain:
+            obj["explain"] = "\n".join(explain)
+        items.append(obj)
+    return items
+
+def _legacy_load_bank(json_dir):
+    bank = []
+    for f in sorted(json_dir.glob("Q*~Q*.json")):
+        try:
+            data = json.loads(f.read_text(encoding="utf-8"))
+            if isinstance(data, list):
+                for q in data:
+                    if q.get("choices") and q.get("answers"):
+                        bank.append(Question.from_dict(q))
+        except Exception as e:
+            print(f"[WARN] {f.name} 읽기 실패: {e}")
+    return bank
+
+def _legacy_grade(run, selected):
+    correct = 0
+    review = []
+    for q in run:
+        qid = q.get("id")
+        ua = set(selected.get(qid, set()))
+        ca = set(q.get("answers", []))
+        ok = ua == ca
+        if ok:
+            correct += 1
+        review.append({
+            "id": qid,
+            "title": (q.get("title") or "").strip(),
+            "correct": ok,
+            "user": sorted(list(ua), key=lambda x: LETTERS.index(x)),
+            "answer": sorted(list(ca), key=lambda x: LETTERS.index(x)),
+        })
+    return correct, review
+
+def _legacy_parse_answer_positions(raw):
+    pc = parse_cbt
+    s = pc._to_ascii((raw or "").strip())
+    if not s:
+        return []
+    s = re.sub(r"[\(\[（【].*?[\)\]）】]", "", s)
+    s = s.replace("그리고", ",").replace("및", ",").replace("와", ",").replace("또는", ",").replace("or", ",")
+    poses = []
+    for p in [p for p in pc.SPLIT_TOK.split(s) if p]:
+        for ch in p:
+            pos = pc.token_to_pos(ch)
+            if pos:
+                poses.append(pos)
+    return sorted(set(poses))
+
+_SERVICES = ("Amazon S3", "Amazon EC2", "AWS Lambda", "Amazon RDS", "Amazon Aurora", "Amazon DynamoDB",
+             "Amazon CloudFront", "Amazon SQS", "Amazon SNS", "AWS Global Accelerator", "Amazon EFS",
+             "Amazon FSx for Lustre", "AWS Direct Connect", "AWS Site-to-Site VPN", "Amazon Kinesis Data Streams")
+
+def synthetic_bank_json(n: int, seed: int = 0) -> str:
+    """문항 n개짜리 JSON (보기 절반은 서비스 이름처럼 짧고 겹치는 텍스트)"""
+    rng = random.Random(seed)
+    items = []
+    for qid in range(1, n + 1):
+        k = rng.randint(4, 5)
+        if rng.random() < 0.5:
+            choices = rng.sample(_SERVICES, k)
+        else:
+            choices = [_sentence(rng, 6, 20) for _ in range(k)]
+        q = {"id": qid, "group": rng.choice(("part1", "part2", "new")),
+             "title": _sentence(rng, 2, 5), "context": _sentence(rng, 40, 120),
+             "choices": choices, "answers": sorted(rng.sample("ABCD", rng.choice((1, 1, 1, 2))))}
+        if rng.random() < 0.6:
+            q["link"] = f"https://docs.aws.amazon.com/{rng.randint(1, 999)}"
+            q["links"] = [q["link"]]
+        if rng.random() < 0.8:
+            q["explain"] = _sentence(rng, 20, 60)
+        items.append(q)
+    return json.dumps(items, ensure_ascii=False)
+
+# ---------- 측정 ----------
+
+def _timed(fn, *args):
+    t = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - t
+
+def bench_clean(mb: float):
+    lines = synthetic_lines(mb)
+    print(f"[clean] 입력 {len(lines):,}줄 (~{mb}MB)")
+    before, t0 = _timed(_legacy_join_lines, lines)
+    after,  t1 = _timed(lambda ls: list(clean_lines.iter_join_lines(ls)), lines)
+    assert before == after, "출력 불일치"
+    print(f"  before: {len(lines) / t0:,.0f} lines/s ({t0:.2f}s)")
+    print(f"  after : {len(lines) / t1:,.0f} lines/s ({t1:.2f}s)  x{t0 / t1:.2f}")
+
+def pathological_lines(fragments: int, blocks: int) -> list[str]:
+    """종결 부호 없는 긴 문단 / 줄바꿈이 심한 보기 / 잘게 끊긴 URL (각각 fragments 조각)"""
+    lines = []
+    for b in range(blocks):
+        lines += [f"조각{i} 문장이 끝나지 않고 이어짐" for i in range(fragments)] + [""]
+        lines += [f"A. 보기{b}"] + [f"보기 이어지는 줄 {i}" for i in range(fragments)]
+        lines += ["https://docs.aws.amazon.com/"] + [f"seg{i}-" for i in range(fragments)]
+        lines += ["Answer: A", ""]
+    return lines
+
+def bench_join(fragments: int, blocks: int):
+    lines = pathological_lines(fragments, blocks)
+    print(f"[join] 블록 {blocks}개 × 조각 {fragments:,}개 (문단/보기/URL), 입력 {len(lines):,}줄")
+    before, t0 = _timed(_legacy_join_lines, lines)
+    after,  t1 = _timed(lambda ls: list(clean_lines.iter_join_lines(ls)), lines)
+    assert before == after, "출력 불일치"
+    print(f"  before: {t0:.3f}s")
+    print(f"  after : {t1:.3f}s  x{t0 / t1:.1f}")
+
+def bench_parse(mb: float):
+    text = "\n".join(clean_lines.iter_join_lines(synthetic_lines(mb))) + "\n"
+    print(f"[parse] 정리된 입력 {len(text.encode('utf-8')) / 1048576:.1f}MB")
+    before, t0 = _timed(_legacy_parse_one, text, "part2")
+    after,  t1 = _timed(parse_cbt.parse_one, text, "part2")
+    assert before == [{k: v for k, v in q.items() if k != "qnum"} for q in after], "출력 불일치"   # qnum 은 보고서용
+    print(f"  before: {len(before) / t0:,.0f} 문항/s ({t0:.2f}s)")
+    print(f"  after : {len(after) / t1:,.0f} 문항/s ({t1:.2f}s)  x{t0 / t1:.2f}")
+
+_TYPICAL_ANSWERS = ["A", "B", "C", "D", "B,D", "A, C", "AC", "①③", "2", "1,3", "가", "가, 다",
+                    "C/E", "b d", "(복수정답) A, C", "B 및 D", "A or C", "Answer"]
+
+def _outcome(fn, raw):
+    try:
+        return fn(raw)
+    except Exception as e:  # 이전 구현이 예외를 내는 입력은 같은 예외가 나는지 비교
+        return type(e)
+
+def verify_answer_positions():
+    """이전 구현과 전수 비교: 모든 유니코드 한 글자 + 관련 글자 두 글자 조합 + 전형적 정답 문자열"""
+    old, new = _legacy_parse_answer_positions, parse_cbt.parse_answer_positions
+    cases = [chr(c) for c in range(0x110000) if not 0xD800 <= c <= 0xDFFF]
+    alpha = (list("ABCDZabcz0123456789 ,/&;·|()[]（）【】") + list(parse_cbt.CIRC_MAP) + parse_cbt.KOR_SEQ
+             + ["그리고", "및", "와", "또는", "or", "OR", "ı", "ſ", "K", "²", "፩", "１", "Ａ"])
+    cases += [a + b for a in alpha for b in alpha]
+    cases += _TYPICAL_ANSWERS + ["", None]
+    bad = [c for c in cases if _outcome(old, c) != _outcome(new, c)]
+    print(f"[answer] 동등성 확인 {len(cases):,}건, 불일치 {len(bad)}건")
+    assert not bad, bad[:10]
+
+def bench_answer(n: int, verify: bool = True):
+    if verify:
+        verify_answer_positions()
+    rng = random.Random(0)
+    sample = [rng.choice(_TYPICAL_ANSWERS) for _ in range(n)]
+    parse_cbt._answer_positions.cache_clear()
+    _, t0 = _timed(lambda xs: [_legacy_parse_answer_positions(x) for x in xs], sample)
+    _, t1 = _timed(lambda xs: [parse_cbt.parse_answer_positions(x) for x in xs], sample)
+    print(f"[answer] 전형적 정답 문자열 {n:,}건")
+    print(f"  before: {t0 / n * 1e9:,.0f} ns/건")
+    print(f"  after : {t1 / n * 1e9:,.0f} ns/건  x{t0 / t1:.1f}")
+
+def _traced_size(build):
+    """build() 결과가 살아 있는 동안의 할당량 (bytes)"""
+    gc.collect()
+    tracemalloc.start()
+    obj = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return obj, size
+
+def bench_model(n: int):
+    text = synthetic_bank_json(n)
+    dicts, b0 = _traced_size(lambda: json.loads(text))
+    qs, b1 = _traced_size(lambda: [Question.from_dict(q) for q in json.loads(text)])
+    assert [q.to_dict() for q in qs] == dicts, "to_dict 불일치"
+    print(f"[model] 문항 {n:,}개 (JSON {len(text.encode('utf-8')) / 1048576:.1f}MB)")
+    print(f"  dict    : {b0 / 1048576:7.1f}MB ({b0 / n:,.0f} B/문항)")
+    print(f"  Question: {b1 / 1048576:7.1f}MB ({b1 / n:,.0f} B/문항)  -{(1 - b1 / b0) * 100:.0f}%")
+
+def write_shards(d: Path, n: int, shards: int):
+    """문항 n개를 shards 개 파일로 나눠 저장 (Q1~Q50.json ...)"""
+    items = json.loads(synthetic_bank_json(n))
+    per = -(-n // shards)
+    for k in range(0, n, per):
+        part = items[k:k + per]
+        (d / f"Q{part[0]['id']}~Q{part[-1]['id']}.json").write_text(
+            json.dumps(part, ensure_ascii=False, indent=2), encoding="utf-8")
+
+def bench_load(shard_counts: list[int], n: int):
+    decoder = "orjson" if loader.orjson is not None else "json"
+    print(f"[load] 문항 {n:,}개, 디코더 {decoder}, 스레드 {loader.LOAD_WORKERS}, CPU {os.cpu_count()}")
+    for shards in shard_counts:
+        with tempfile.TemporaryDirectory() as tmp:
+            d = Path(tmp)
+            write_shards(d, n, shards)
+            before, t0 = _timed(_legacy_load_bank, d)
+            after,  t1 = _timed(loader.load_bank, d)        # 스냅샷 없음 → 전부 파싱 + 스냅샷 저장
+            warm,   t2 = _timed(loader.load_bank, d)        # 변경 없음 → 스냅샷만
+            f = sorted(d.glob("Q*~Q*.json"))[0]
+            os.utime(f)                                     # mtime 만 바뀜 → 해시 비교 후 재사용
+            touched, t3 = _timed(loader.load_bank, d)
+            f.write_text(f.read_text(encoding="utf-8").replace('"title": "', '"title": "*', 1), encoding="utf-8")
+            edited, t4 = _timed(loader.load_bank, d)        # 파일 하나만 다시 파싱
+            ref = [q.to_dict() for q in before]
+            assert ref == [q.to_dict() for q in after] == [q.to_dict() for q in warm] \
+                == [q.to_dict() for q in touched], "출력 불일치"
+            assert [q.to_dict() for q in edited] == [q.to_dict() for q in _legacy_load_bank(d)], "출력 불일치"
+            print(f"  {shards:5,} 파일: before {t0:.2f}s / 첫 로딩 {t1:.2f}s  x{t0 / t1:.2f}"
+                  f" / 변경 없음 {t2 * 1000:.0f}ms / touch 1개 {t3 * 1000:.0f}ms / 수정 1개 {t4 * 1000:.0f}ms")
+
+_QUERIES = ['"Aurora Global Database"', '"S3 Object Lock"', "버킷 암호화", "Lambda OR CloudFront",
+            "EC2 -VPC", "데이터를 저장", '"Amazon Kinesis Data Streams" 해야', '"Database Global"',
+            '"버킷 에"', "킷", "람 -VPC"]
+
+def _brute_match(docs: list[str], query: str) -> set:
+    """색인 없이 토큰 집합/본문으로 같은 불리언 조건 평가 (결과 비교용)"""
+    clauses, exclude = search.parse_query(query)
+
+    def has(toks, text, item):
+        ok = all(t in toks or (len(t) == 1 and "가" <= t <= "힣" and t in text) for t in item[0])
+        return ok and (item[1] is None or search.has_phrase(search.words(text), item[1]))
+
+    out = set()
+    for d, text in enumerate(docs):
+        toks = set(search.tokenize(text))
+        if clauses and all(any(has(toks, text, a) for a in alts) for alts in clauses) \
+                and not any(has(toks, text, x) for x in exclude):
+            out.add(d)
+    return out
+
+def bench_search(n: int):
+    qs = [Question.from_dict(q) for q in json.loads(synthetic_bank_json(n))]
+    index, t0 = _timed(search.SearchIndex.build, qs)
+    blob = pickle.dumps(index, pickle.HIGHEST_PROTOCOL)
+    _, t1 = _timed(pickle.loads, blob)
+    print(f"[search] 문항 {n:,}개: 색인 생성 {t0:.2f}s, 저장된 색인 읽기 {t1 * 1000:.0f}ms ({len(blob) / 1048576:.1f}MB)")
+    docs = [search._doc_text(q) for q in qs]
+    for query in _QUERIES:
+        assert index.match(query) == _brute_match(docs, query), query
+        hits, t = _timed(index.search, query, 20)
+        print(f"  {query:40} {len(index.match(query)):6,}건  {t * 1000:6.2f}ms")
+
+def _traced_peak(fn):
+    gc.collect()
+    tracemalloc.start()
+    t = time.perf_counter()
+    result = fn()
+    dt = time.perf_counter() - t
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, dt, peak
+
+def bench_sample(sizes: list[int], k: int = 65):
+    print(f"[sample] {k}문항 뽑기: load_bank 후 rng.sample vs iter_bank 저수지 샘플링 (분할 파일당 100문항)")
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            d = Path(tmp)
+            write_shards(d, n, -(-n // 100))
+            _, t0, m0 = _traced_peak(lambda: loader.sample_questions(_legacy_load_bank(d), k, seed=1))
+            _, t1, m1 = _traced_peak(lambda: loader.sample_questions(loader.iter_bank(d), k, seed=1))
+            _, t2, m2 = _traced_peak(lambda: loader.sample_questions(
+                loader.iter_bank(d), k, seed=1, quotas={"part1": 30, "part2": 25, "new": 10}))
+            print(f"  {n:7,}문항: 전체 로딩 {t0:.2f}s 최대 {m0 / 1048576:6.1f}MB"
+                  f" / 스트림 {t1:.2f}s 최대 {m1 / 1048576:4.1f}MB"
+                  f" / 그룹별 {t2:.2f}s 최대 {m2 / 1048576:4.1f}MB")
+
+def _perturb(rng, q: dict, new_id: int) -> dict:
+    """표현만 조금 바꾼 사본 (단어 한두 개 교체, 공백/문장부호 변경)"""
+    words = q["context"].split()
+    for _ in range(rng.randint(1, 2)):
+        words[rng.randrange(len(words))] = rng.choice(_WORDS)
+    return dict(q, id=new_id, group="part2", context="  ".join(words) + " .",
+                choices=[c.replace(" ", "  ") for c in q["choices"]])
+
+def dup_bank(n: int, dup_ratio: float = 0.2, seed: int = 0):
+    rng = random.Random(seed)
+    items = json.loads(synthetic_bank_json(n, seed))
+    pairs = set()
+    for q in rng.sample(items, int(n * dup_ratio)):
+        items.append(_perturb(rng, q, len(items) + 1))
+        pairs.add((q["id"], items[-1]["id"]))
+    return items, pairs
+
+def bench_dedup(n: int, verify: int):
+    if verify:
+        items, _ = dup_bank(verify)
+        sets = [dedup.shingles(q) for q in items]
+        truth, t0 = _timed(lambda: {(items[i]["id"], items[j]["id"]) for i in range(len(items))
+                                    for j in range(i + 1, len(items))
+                                    if dedup.jaccard(sets[i], sets[j]) >= dedup.JACCARD_MIN})
+        clusters, t1 = _timed(dedup.find_clusters, items)
+        found = {(c["canonical"], m["id"]) for c in clusters for m in c["members"]}
+        print(f"[dedup] {len(items):,}문항 전체 쌍 비교 {t0:.1f}s ({len(truth)}쌍) vs LSH {t1:.2f}s ({len(found)}쌍),"
+              f" 놓친 쌍 {len(truth - found)}")
+    items, pairs = dup_bank(n)
+    clusters, t = _timed(dedup.find_clusters, items)
+    found = {(c["canonical"], m["id"]) for c in clusters for m in c["members"]}
+    print(f"[dedup] {len(items):,}문항 (심은 중복 {len(pairs)}쌍): {t:.2f}s, 찾음 {len(found & pairs)}"
+          f" / 그 외 {len(found - pairs)}쌍, 제거 후 {len(dedup.collapse(items, clusters)):,}문항")
+
+def bench_validate(shards: int, n: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        d = Path(tmp)
+        write_shards(d, n, shards)
+        cold, t0 = _timed(validator.validate_bank, d)
+        warm, t1 = _timed(validator.validate_bank, d)
+        f = sorted(d.glob("Q*~Q*.json"))[0]
+        f.write_text(f.read_text(encoding="utf-8").replace('"answers": [', '"answers": ["Z", ', 1), encoding="utf-8")
+        edited, t2 = _timed(validator.validate_bank, d)
+        assert cold["errors"] == warm["errors"] == [] and edited["error_count"] == 1
+        print(f"[validate] {shards:,}개 파일 / {n:,}문항: 처음 {t0:.2f}s, 변경 없음 {t1:.2f}s,"
+              f" 1개 수정 {t2:.2f}s (다시 검사 {edited['checked']}개)")
+
+def bench_grade(rounds: int, k: int = 65):
+    rng = random.Random(0)
+    run = [Question.from_dict(q) for q in json.loads(synthetic_bank_json(k))]
+    sel_sets = {q.id: set(rng.sample("ABCD", rng.choice((1, 1, 2)))) for q in run}
+    sel_masks = {qid: letters_to_mask(s) for qid, s in sel_sets.items()}
+    (c0, r0), (c1, r1) = _legacy_grade(run, sel_sets), grader.grade(run, sel_masks)
+    assert c0 == c1 and [(r["user"], r["answer"]) for r in r0] == \
+        [(mask_to_letters(r["user_mask"]), mask_to_letters(r["answer_mask"])) for r in r1], "채점 불일치"
+    _, t0 = _timed(lambda: [_legacy_grade(run, sel_sets) for _ in range(rounds)])
+    _, t1 = _timed(lambda: [grader.grade(run, sel_masks) for _ in range(rounds)])
+    _, t2 = _timed(lambda: [grader.grade(run, sel_masks, partial=True) for _ in range(rounds)])
+    print(f"[grade] {k}문항 채점 {rounds:,}회")
+    print(f"  before(set+정렬): {t0 / rounds * 1e6:6.1f} us/회")
+    print(f"  after (마스크)  : {t1 / rounds * 1e6:6.1f} us/회  x{t0 / t1:.1f}")
+    print(f"  부분 점수       : {t2 / rounds * 1e6:6.1f} us/회")
+
+def bench_batch(n_sheets: int, k: int = 65):
+    from app.services import batch_grader      # numpy 필요
+    rng = random.Random(0)
+    run = [Question.from_dict(q) for q in json.loads(synthetic_bank_json(k))]
+    key = batch_grader.key_vector(run)
+    sheets = [{q.id: (q.answer_mask if rng.random() < 0.8 else rng.randrange(1, 16)) for q in run}
+              for _ in range(n_sheets)]
+    mat, t_conv = _timed(batch_grader.sheet_matrix, run, sheets)
+    for partial in (False, True):
+        res, t1 = _timed(batch_grader.grade_batch, mat, key, partial)
+        sub = min(n_sheets, 5000)
+        loop, t0 = _timed(lambda: [grader.grade(run, s, partial=partial) for s in sheets[:sub]])
+        assert all(abs(a - b) < 1e-9 for (a, _), b in zip(loop, res["scores"][:sub])), "점수 불일치"
+        assert all(grader.status_from_score(a, k) == b for (a, _), b in zip(loop, res["status"][:sub]))
+        t0 *= n_sheets / sub
+        mode = "부분 점수" if partial else "정답 일치"
+        print(f"[batch] {n_sheets:,}장 × {k}문항 ({mode}): grade() 반복 약 {t0:.1f}s"
+              f" vs grade_batch {t1:.3f}s  x{t0 / t1:.0f}")
+    print(f"  (dict 답안지 → 배열 변환 {t_conv:.2f}s 별도)")
+
+def bench_schedule(n: int, k: int = 65):
+    rng = random.Random(0)
+    t0 = 1_700_000_000
+    bank = [Question.from_dict(q) for q in json.loads(synthetic_bank_json(n))]
+    s = scheduler.Scheduler()
+    for day in range(5):
+        s.update([{"id": q.id, "correct": rng.random() < 0.7} for q in bank if rng.random() < 0.5],
+                 t0 + day * scheduler.DAY)
+    now = t0 + 10 * scheduler.DAY
+    with tempfile.TemporaryDirectory() as tmp:
+        d = Path(tmp)
+        s.save(d)
+        rows = {str(q): [s.due[i], s.interval[i], s.ease[i], s.reps[i]] for i, q in enumerate(s.ids)}
+        (d / "schedule.json").write_text(json.dumps(rows), encoding="utf-8")
+        _, t_json = _timed(lambda: json.loads((d / "schedule.json").read_text(encoding="utf-8")))
+        s2, t_bin = _timed(scheduler.Scheduler.load, d)
+        size_bin = (d / scheduler.SCHEDULE_NAME).stat().st_size
+        size_json = (d / "schedule.json").stat().st_size
+        print(f"[schedule] 일정 {len(s2):,}문항: schedule.bin {size_bin / 1024:.0f}KB 읽기 {t_bin * 1000:.1f}ms"
+              f" vs JSON {size_json / 1024:.0f}KB 읽기 {t_json * 1000:.1f}ms")
+        items = json.loads(synthetic_bank_json(n))
+        packbank.write_pack(d / "bank.pack", items)
+        lookup = {q.id: q for q in bank}
+        picked, t_list = _timed(lambda: [scheduler.Scheduler.load(d).pick(bank, k, now, seed=1) for _ in range(20)])
+        with packbank.PackedBank(d / "bank.pack") as pack:
+            from_pack, t_pack = _timed(lambda: [loader.detach(scheduler.Scheduler.load(d).pick(pack, k, now, seed=1))
+                                                for _ in range(20)])
+        naive, t_sort = _timed(lambda: [[lookup[q] for _, q in sorted(zip(s2.due, s2.ids))[:k]] for _ in range(20)])
+        assert {q.id for q in picked[0]} == {q.id for q in naive[0]} == {q.id for q in from_pack[0]}, "출제 결과 불일치"
+    print(f"  읽기+{k}문항 출제 ×20: 전체 정렬 {t_sort:.3f}s vs 리스트 은행 {t_list:.3f}s (id 사전 포함)"
+          f" vs pack {t_pack:.3f}s | due {s2.due_count(now):,}문항")
+    s3 = scheduler.Scheduler()
+    for day in range(200):
+        s3.update([{"id": 1, "correct": True}], t0 + day * scheduler.DAY)
+    with tempfile.TemporaryDirectory() as tmp:
+        s3.save(Path(tmp))                      # u16 열에 들어가야 함
+    assert s3.ease[0] == scheduler.EASE_MAX, "ease 상한"
+
+def _naive_weighted(weights, k, seed):
+    """random.choices 를 중복이 안 나올 때까지 반복 (뽑을 때마다 누적합 O(n))"""
+    rng, out = random.Random(seed), []
+    while len(out) < k:
+        i = rng.choices(range(len(weights)), weights)[0]
+        if i not in out:
+            out.append(i)
+    return out
+
+def bench_weak(n: int, k: int = 65, rounds: int = 20):
+    rng = random.Random(0)
+    bank = [Question.from_dict(q) for q in json.loads(synthetic_bank_json(n))]
+    stats = {"offset": 1, "questions": {}}
+    for q in bank:
+        if rng.random() < 0.6:
+            a = rng.randint(1, 8)
+            stats["questions"][str(q.id)] = {"attempts": a, "wrong": rng.randint(0, a)}
+    sampler, t_build = _timed(loader.WeakSampler, bank, stats)
+    _, t_draw = _timed(lambda: [sampler.sample(k, s) for s in range(rounds)])
+    assert [q.id for q in sampler.sample(k, 3)] == [q.id for q in loader.weak_sample(bank, k, stats, 3)]
+    weights = loader.error_weights([q.id for q in bank], stats)
+    _, t_naive = _timed(lambda: [_naive_weighted(weights, k, s) for s in range(rounds)])
+    print(f"[weak] {n:,}문항 중 {k}문항 ×{rounds}: random.choices 반복 {t_naive:.3f}s"
+          f" vs alias 표 {t_draw:.4f}s (표 만들기 처음 한 번 {t_build:.3f}s)")
+
+def xobject_pdf(texts: list[str]) -> bytes:
+    """페이지마다 콘텐츠가 "q /X0 Do Q" 뿐이고 글자는 각자 다른 Form XObject 안에 있는 PDF"""
+    n = len(texts)
+    objs = {1: b"<< /Type /Catalog /Pages 2 0 R >>",
+            3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+            4: b"<< /Length 8 >>\nstream\nq /X0 Do Q\nendstream"}      # 모든 페이지가 같은 콘텐츠 스트림
+    kids = []
+    for k, text in enumerate(texts):
+        page, form = 5 + 2 * k, 6 + 2 * k
+        body = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode()
+        objs[form] = (b"<< /Type /XObject /Subtype /Form /BBox [0 0 612 792] "
+                      b"/Resources << /Font << /F1 3 0 R >> >> /Length %d >>\nstream\n%s\nendstream"
+                      % (len(body), body))
+        objs[page] = (b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+                      b"/Resources << /XObject << /X0 %d 0 R >> >> >>" % form)
+        kids.append(b"%d 0 R" % page)
+    objs[2] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(kids), n)
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for oid in sorted(objs):
+        offsets[oid] = len(out)
+        out += b"%d 0 obj\n%s\nendobj\n" % (oid, objs[oid])
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objs) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offsets[oid] for oid in sorted(objs))
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objs) + 1, xref)
+    return bytes(out)
+
+def bench_pagecache():
+    import extract_text     # pdfplumber 필요
+    texts = ["Page one text", "Second page different"]
+    with tempfile.TemporaryDirectory() as tmp:
+        d = Path(tmp)
+        src = d / "forms.pdf"
+        src.write_bytes(xobject_pdf(texts))
+        plain = "".join(extract_text.iter_pages(src))
+        cache = extract_text.PageCache(d / "cache", 1 << 20)
+        cold = "".join(extract_text.iter_pages(src, cache=cache))
+        warm = "".join(extract_text.iter_pages(src, cache=cache))
+    assert plain == "".join(t + "\n" for t in texts), f"추출 결과 이상: {plain!r}"
+    assert cold == plain and warm == plain, f"캐시 결과 불일치: {cold!r} / {warm!r}"
+    print("[pagecache] 콘텐츠 스트림이 같고 Form XObject 만 다른 페이지: 캐시 없음/처음/재실행 결과 일치")
+
+def bench_fresh(n: int = 2000, shards: int = 20):
+    """pack/DB 최신 여부 회귀 확인: 분할 파일이 빠지거나 내용이 바뀌면(mtime 이 옛것이어도) JSON 을 읽어야 함"""
+    with tempfile.TemporaryDirectory() as tmp:
+        d = Path(tmp)
+        write_shards(d, n, shards)
+        items = [q.to_dict() for q in loader.load_bank(d)]
+        packbank.write_pack(d / packbank.PACK_NAME, items, loader.shard_manifest(d))
+
+        def kind():
+            with loader.opened_bank(d) as bank:
+                return type(bank).__name__, len(bank)
+
+        assert kind() == ("PackedBank", n)
+        files = sorted(d.glob("Q*~Q*.json"))
+        st = files[0].stat()
+        os.utime(files[0], ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))    # 복사로 mtime 만 바뀜 → 해시 같음
+        assert kind() == ("PackedBank", n), "mtime 만 바뀐 파일 때문에 pack 을 버림"
+        raw = files[0].read_bytes()
+        files[0].write_bytes(raw.replace(b'"title": "', b'"title":"#', 1))          # 크기는 그대로
+        os.utime(files[0], ns=(st.st_atime_ns, st.st_mtime_ns - 10**9))    # 옛 mtime 으로 복원된 수정본
+        assert kind()[0] == "list", "내용이 바뀐 분할 파일을 못 알아챔"
+        files[0].write_bytes(raw)
+        assert kind() == ("PackedBank", n)
+        gone = files[-1].read_bytes()
+        files[-1].unlink()                                                 # 분할 파일 삭제
+        stale = kind()
+        assert stale[0] == "list" and stale[1] < n, "삭제된 분할 파일의 문항이 pack 에서 나옴"
+        files[-1].write_bytes(gone)
+        with loader.opened_bank(d) as bank:
+            run = loader.detach(loader.sample_questions(bank, 5, seed=1))
+        packbank.write_pack(d / packbank.PACK_NAME, items, loader.shard_manifest(d))   # 닫혀 있으므로 교체 가능
+        assert [q.to_dict() for q in run] == [q.to_dict() for q in loader.sample_questions([Question.from_dict(q) for q in items], 5, seed=1)]
+    print(f"[fresh] 분할 파일 {shards}개: mtime 만 변경 → pack 사용 / 내용 변경·삭제 → JSON 으로 되돌아감")
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="성능 측정")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("clean", help="clean_lines 줄 분류/병합 처리량")
+    p.add_argument("--mb", type=float, default=100)
+    p = sub.add_parser("join", help="join_lines 긴 문단/보기/URL 조각 결합 (회귀 확인)")
+    p.add_argument("--fragments", type=int, default=10000)
+    p.add_argument("--blocks", type=int, default=5)
+    p = sub.add_parser("parse", help="parse_cbt.parse_one 처리량")
+    p.add_argument("--mb", type=float, default=20)
+    p = sub.add_parser("answer", help="parse_answer_positions 마이크로 벤치 + 동등성 전수 확인")
+    p.add_argument("--n", type=int, default=200000)
+    p.add_argument("--no-verify", action="store_true")
+    p = sub.add_parser("model", help="문항 dict vs Question 메모리 (tracemalloc)")
+    p.add_argument("--n", type=int, default=50000)
+    p = sub.add_parser("search", help="검색 색인 생성/질의 시간")
+    p.add_argument("--n", type=int, default=10000)
+    p = sub.add_parser("sample", help="전체 로딩 vs 스트리밍 저수지 샘플링 메모리/시간")
+    p.add_argument("--sizes", default="5000,20000,50000")
+    p = sub.add_parser("dedup", help="MinHash/LSH 근사 중복 탐지 (전체 쌍 비교와 결과 비교)")
+    p.add_argument("--n", type=int, default=5000)
+    p.add_argument("--verify", type=int, default=1500)
+    p = sub.add_parser("validate", help="일괄 검증 처음/캐시 재사용 시간")
+    p.add_argument("--shards", type=int, default=1000)
+    p.add_argument("--n", type=int, default=50000)
+    p = sub.add_parser("grade", help="채점 (set vs 비트마스크)")
+    p.add_argument("--rounds", type=int, default=20000)
+    p = sub.add_parser("batch", help="답안지 일괄 채점 (grade 반복 vs NumPy)")
+    p.add_argument("--sheets", type=int, default=100000)
+    p = sub.add_parser("schedule", help="간격 반복 일정 저장/읽기, 출제 시간")
+    p.add_argument("--n", type=int, default=50000)
+    p = sub.add_parser("weak", help="오답률 가중 출제 (alias 표 vs random.choices)")
+    p.add_argument("--n", type=int, default=50000)
+    sub.add_parser("fresh", help="pack 최신 여부 회귀 확인 (분할 파일 삭제/옛 mtime 복원)")
+    sub.add_parser("pagecache", help="페이지 캐시 키 회귀 확인 (Form XObject 만 다른 페이지)")
+    p = sub.add_parser("load", help="load_bank 분할 파일 수별 로딩 시간")
+    p.add_argument("--shards", default="10,100,1000")
+    p.add_argument("--n", type=int, default=50000)
+    args = ap.parse_args(argv)
+    if args.cmd == "clean":
+        bench_clean(args.mb)
+    elif args.cmd == "join":
+        bench_join(args.fragments, args.blocks)
+    elif args.cmd == "parse":
+        bench_parse(args.mb)
+    elif args.cmd == "answer":
+        bench_answer(args.n, verify=not args.no_verify)
+    elif args.cmd == "model":
+        bench_model(args.n)
+    elif args.cmd == "search":
+        bench_search(args.n)
+    elif args.cmd == "sample":
+        bench_sample([int(x) for x in args.sizes.split(",")])
+    elif args.cmd == "dedup":
+        bench_dedup(args.n, args.verify)
+    elif args.cmd == "validate":
+        bench_validate(args.shards, args.n)
+    elif args.cmd == "grade":
+        bench_grade(args.rounds)
+    elif args.cmd == "batch":
+        bench_batch(args.sheets)
+    elif args.cmd == "schedule":
+        bench_schedule(args.n)
+    elif args.cmd == "weak":
+        bench_weak(args.n)
+    elif args.cmd == "pagecache":
+        bench_pagecache()
+    elif args.cmd == "fresh":
+        bench_fresh()
+    elif args.cmd == "load":
+        bench_load([int(x) for x in args.shards.split(",")], args.n)
+
+if __name__ == "__main__":
+    main()
@@ -30,6 +30,27 @@ RE_CHOICE_NUM   = re.compile(r"^\d+[\.\)]\s+")             # 1.  1)
 RE_CHOICE_CIRC  = re.compile(r"^[①②③④⑤⑥⑦⑧⑨⑩⑪⑫⑬⑭⑮⑯⑰⑱⑲⑳]\s*")
 RE_CHOICE_KOR   = re.compile(r"^[가-힣]\.[ \t]+")            # 가. 나. 다. (필요시 확장)
 
+# --- 한 번에 분류하는 통합 패턴 ---
+# 위 패턴들을 하나로 묶어 줄마다 match 한 번으로 종류를 정함 (서로 겹치지 않음)
+T_BLANK, T_Q, T_CHOICE, T_ANSWER, T_EXPL, T_LINK, T_TEXT = range(7)
+BORDER_KINDS = frozenset((T_Q, T_CHOICE, T_ANSWER, T_EXPL, T_LINK))
+
+RE_LINE_KIND = re.compile(r"""
+    (?P<q>Q\d+\s*$)
+  | (?P<choice>[A-Z][\.\)]\s | \d+[\.\)]\s | [①②③④⑤⑥⑦⑧⑨⑩⑪⑫⑬⑭⑮⑯⑰⑱⑲⑳] | [가-힣]\.[ \t])
+  | (?P<answer>(?i:Answer|Answers|정답|답)\s*[:：])
+  | (?P<expl>설명\d*\s*[:：])
+  | (?P<link>(?i:https?://))
+""", re.X)
+_KIND_BY_GROUP = {"q": T_Q, "choice": T_CHOICE, "answer": T_ANSWER, "expl": T_EXPL, "link": T_LINK}
+
+def classify(s: str) -> int:
+    """줄 종류 태그 (s는 strip된 줄)"""
+    if not s:
+        return T_BLANK
+    m = RE_LINE_KIND.match(s)
+    return _KIND_BY_GROUP[m.lastgroup] if m else T_TEXT
+
 # 문장 종결 힌트 (한국어/영문)
 ENDMARK = (
     ".", "?", "!", "…", ".”", "?”", "!”", ").", "다.", "요.", "니다.", "습니다.", "함.", "함?"
@@ -66,102 +87,108 @@ def _looks_like_url_continuation(s: str) -> bool:
     return False
 
 # URL 줄바꿈/띄어쓰기 보정 (공격적으로 병합)
-def _merge_url_wraps(lines: list[str]) -> list[str]:
-    out = []
-    i = 0
-    N = len(lines)
-    while i < N:
-        cur = lines[i].rstrip("\n")
-        if RE_LINK.match(cur.strip()):
-            # 현재 줄에서 공백/개행 제거
-            buf = cur.replace(" ", "").replace("\t", "").replace("\u00A0", "").strip()
-            j = i + 1
-            while j < N:
-                nxt_raw = lines[j]
-                nxt = (nxt_raw or "").strip()
+# (종류, 줄) 스트림을 받아 URL 조각을 합친 (종류, 줄) 스트림을 내보냄 — 한 줄 미리보기만 사용
+def _merge_url_wraps(tagged):
+    it = iter(tagged)
+    cur = next(it, None)
+    while cur is not None:
+        kind, s = cur
+        if kind == T_LINK:
+            # 현재 줄에서 공백/개행 제거 (조각은 리스트에 모았다가 한 번에 join)
+            parts = [s.replace(" ", "").replace("\t", "").replace("\u00A0", "")]
+            cur = next(it, None)
+            while cur is not None:
+                nkind, nxt = cur
 
                 # 경계(새 Q/정답/설명/새 URL/보기 머리)면 중단
-                if RE_Q.match(nxt) or RE_ANSWER.match(nxt) or RE_EXPL.match(nxt) or RE_LINK.match(nxt) \
-                   or RE_CHOICE_ALPHA.match(nxt) or RE_CHOICE_NUM.match(nxt) or RE_CHOICE_CIRC.match(nxt) or RE_CHOICE_KOR.match(nxt):
+                if nkind in BORDER_KINDS:
                     break
 
                 # 이어붙일지 판정 (빈 줄 포함 허용)
                 if _looks_like_url_continuation(nxt):
                     nxt_clean = nxt.replace(" ", "").replace("\t", "").replace("\u00A0", "")
-                    buf += nxt_clean  # 하이픈 유무에 관계없이 그대로 연결
-                    j += 1
+                    parts.append(nxt_clean)  # 하이픈 유무에 관계없이 그대로 연결
+                    cur = next(it, None)
                     continue
                 else:
                     break
 
-            out.append(buf)
-            i = j
+            yield T_LINK, "".join(parts)  # 병합되지 않은 cur 는 다음 차례에 그대로 처리
         else:
-            out.append(cur)
-            i += 1
-    return out
+            yield cur
+            cur = next(it, None)
 
 # 보기 라인인지 판별
 def is_choice_head(s: str) -> bool:
-    return bool(RE_CHOICE_ALPHA.match(s) or RE_CHOICE_NUM.match(s) or RE_CHOICE_CIRC.match(s) or RE_CHOICE_KOR.match(s))
+    return classify(s) == T_CHOICE
 
 # 경계(새 블록 시작) 라인인지
 def is_border_line(s: str) -> bool:
     if not s.strip():
         return False
-    return bool(
-        RE_Q.match(s) or
-        is_choice_head(s) or
-        RE_ANSWER.match(s) or
-        RE_EXPL.match(s) or
-        RE_LINK.match(s)
-    )
+    return classify(s) in BORDER_KINDS
 
 
-def join_lines(raw: str) -> str:
-    # 1) 1차 라인화 + URL 보정
-    lines = [ln.rstrip() for ln in raw.splitlines()]
-    lines = _merge_url_wraps(lines)
+def iter_join_lines(lines):
+    """줄 단위 입력을 받아 정리된 줄을 하나씩 내보냄 (문서 전체를 메모리에 올리지 않음)"""
+    # 1) 1차 라인화 + 줄마다 한 번 분류 + URL 보정
+    tagged = _merge_url_wraps((classify(s), s) for s in (ln.strip() for ln in lines))
 
-    out: list[str] = []
-    buf = ""  # 지문/문장 버퍼
+    # 문단/보기는 조각 리스트로 모았다가 확정할 때 한 번만 join (조각 수에 선형)
+    out: list[str] = []   # 확정된 출력 (다음 루프에서 내보냄)
+    last: list[str] = []  # 마지막 출력 줄의 조각 (보기 머리면 다음 줄이 계속 붙음)
+    last_choice = False   # last가 보기 머리인지
+    buf: list[str] = []   # 지문/문장 조각
+    buf_end = False       # buf 마지막 조각이 문장 종결 부호로 끝나는지
+
+    def push(parts: list[str], is_choice: bool):
+        nonlocal last, last_choice
+        if last:
+            out.append(" ".join(last))
+        last, last_choice = parts, is_choice
 
     def flush_buf():
         nonlocal buf
-        if buf.strip():
-            out.append(buf.strip())
-        buf = ""
+        if buf:
+            text = " ".join(buf)
+            push([text], is_choice_head(text))  # 합친 문단이 우연히 보기 모양이 되는 경우
+            buf = []
 
-    for ln in lines:
-        s = ln.strip()
-        if not s:
+    for kind, s in tagged:
+        if out:
+            yield from out
+            out.clear()
+
+        if kind == T_BLANK:
             # 빈 줄은 문단 경계 → 지문 버퍼 확정
             flush_buf()
             continue
 
         # 경계 라인은 그대로 출력 (보기/정답/설명/링크/Q)
-        if is_border_line(s):
+        if kind != T_TEXT:
             flush_buf()
-            out.append(s)
+            push([s], kind == T_CHOICE)
             continue
 
         # 직전에 추가된 라인이 보기 머리였으면 → 같은 보기로 붙임
-        if out and is_choice_head(out[-1]):
-            out[-1] = (out[-1] + " " + s).strip()
+        if last and last_choice:
+            last.append(s)
             continue
 
         # 일반 지문: 문장 종결 전까지 결합
-        if not buf:
-            buf = s
-        else:
-            if not buf.endswith(ENDMARK):
-                buf += " " + s
-            else:
-                flush_buf()
-                buf = s
+        # (조각은 공백으로 이어지므로 종결 여부는 마지막 조각만 보면 됨)
+        if buf and buf_end:
+            flush_buf()
+        buf.append(s)
+        buf_end = s.endswith(ENDMARK)
 
     flush_buf()
-    return "\n".join(out) + "\n"
+    push([], False)
+    yield from out
+
+
+def join_lines(raw: str) -> str:
+    return "\n".join(iter_join_lines(raw.splitlines())) + "\n"
 
 
 def main():
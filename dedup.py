@@ -0,0 +1,128 @@
+# dedup.py (문항 근사 중복 탐지: MinHash + LSH)
+# 사용법: parse_cbt.py / pipeline.py 의 --dedup, --dedup-collapse 로 호출
+#
+# part1/part2 덤프에 조금씩 표현만 바뀐 같은 문제가 많이 겹침 → 전체 쌍 비교 대신
+# - 제목+지문+보기를 정규화(NFKC, 소문자, 기호/공백 제거) 후 글자 SHINGLE 개 단위 조각으로
+# - 조각마다 해시 한 번 → 상위 비트로 NUM_PERM 개 구간 중 하나에 넣고 구간별 최솟값 = MinHash 서명
+#   (one-permutation MinHash: 순열 NUM_PERM 개를 따로 돌리는 것보다 수십 배 빠름, 빈 구간은 옆 구간 값으로 채움)
+# - 서명을 BANDS 개 띠로 잘라 띠가 같은 문항끼리만 후보 쌍 (LSH) → 문항 수에 거의 비례
+# - 후보 쌍은 실제 조각 집합 Jaccard 로 확인 (JACCARD_MIN 이상이면 중복)
+# - 중복 쌍을 묶어 클러스터 → 입력 순서상 첫 문항을 대표(canonical) 로
+# - collapse: 대표만 남기고 제거. 단 정답 보기 텍스트가 대표와 다르면 남기고 보고서에 표시
+
+import re, unicodedata, zlib
+from typing import Dict, List
+
+SHINGLE = 5
+NUM_PERM = 64           # 2의 거듭제곱 (해시 상위 비트로 구간 선택)
+BANDS = 16              # 16띠 × 4행 → Jaccard 약 0.5 이상이면 후보가 될 확률이 높음
+ROWS = NUM_PERM // BANDS
+JACCARD_MIN = 0.7
+REPORT_NAME = "dup_clusters.json"
+
+_MASK64 = (1 << 64) - 1
+_MIX = 0x9E3779B97F4A7C15                           # crc32 → 64비트로 섞는 곱셈 상수
+_BIN_SHIFT = 64 - (NUM_PERM.bit_length() - 1)
+_VALUE_MASK = (1 << _BIN_SHIFT) - 1
+_EMPTY = 1 << 64
+RE_NOISE = re.compile(r"[\W_]+")
+
+def normalize(text: str) -> str:
+    return RE_NOISE.sub("", unicodedata.normalize("NFKC", text).lower())
+
+def _doc_text(q: Dict) -> str:
+    return " ".join([q.get("title") or "", q.get("context") or ""] + list(q.get("choices") or []))
+
+def shingles(q: Dict) -> set:
+    s = normalize(_doc_text(q))
+    if len(s) <= SHINGLE:
+        return {s} if s else set()
+    return {s[i:i + SHINGLE] for i in range(len(s) - SHINGLE + 1)}
+
+def minhash(sh: set) -> tuple:
+    """조각 집합 → NUM_PERM 개 구간별 최솟값 서명"""
+    sig = [_EMPTY] * NUM_PERM
+    for c in map(zlib.crc32, map(str.encode, sh)):
+        h = (c * _MIX) & _MASK64
+        b = h >> _BIN_SHIFT
+        v = h & _VALUE_MASK
+        if v < sig[b]:
+            sig[b] = v
+    if _EMPTY in sig:
+        if min(sig) == _EMPTY:
+            return tuple(sig)
+        # 빈 구간: 오른쪽(순환)으로 처음 만나는 값 + 거리 표시 (짧은 문항끼리 우연히 같아지지 않도록)
+        for b in range(NUM_PERM):
+            if sig[b] == _EMPTY:
+                d = 1
+                while sig[(b + d) % NUM_PERM] >= _EMPTY:
+                    d += 1
+                sig[b] = sig[(b + d) % NUM_PERM] + (d << _BIN_SHIFT) + _EMPTY
+    return tuple(sig)
+
+def candidate_pairs(sigs: List[tuple]) -> set:
+    """띠 하나라도 같은 (i, j) 쌍 (i < j)"""
+    pairs = set()
+    for b in range(BANDS):
+        lo = b * ROWS
+        buckets: Dict[tuple, List[int]] = {}
+        for i, sig in enumerate(sigs):
+            buckets.setdefault(sig[lo:lo + ROWS], []).append(i)
+        for members in buckets.values():
+            if len(members) > 1:
+                pairs.update((a, c) for k, a in enumerate(members) for c in members[k + 1:])
+    return pairs
+
+def jaccard(a: set, b: set) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+def _root(parent: List[int], i: int) -> int:
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+def _answer_texts(q: Dict) -> frozenset:
+    choices = q.get("choices") or []
+    return frozenset(normalize(choices[ord(a) - 65]) for a in q.get("answers") or []
+                     if 0 <= ord(a) - 65 < len(choices))
+
+def find_clusters(items: List[Dict]) -> List[Dict]:
+    """근사 중복 클러스터 목록 (2문항 이상인 것만).
+    [{"canonical": id, "members": [{id, group, title, similarity, same_answer}, ...]}, ...]"""
+    sets = [shingles(q) for q in items]
+    sigs = [minhash(s) for s in sets]
+    parent = list(range(len(items)))
+    sim: Dict[tuple, float] = {}
+    for i, j in candidate_pairs(sigs):
+        jac = jaccard(sets[i], sets[j])
+        if jac >= JACCARD_MIN:
+            sim[(i, j)] = jac
+            ri, rj = _root(parent, i), _root(parent, j)
+            if ri != rj:
+                parent[max(ri, rj)] = min(ri, rj)     # 입력 순서상 앞 문항이 대표
+
+    groups: Dict[int, List[int]] = {}
+    for i in range(len(items)):
+        groups.setdefault(_root(parent, i), []).append(i)
+
+    clusters = []
+    for root, members in groups.items():
+        if len(members) < 2:
+            continue
+        canon = items[root]
+        canon_ans = _answer_texts(canon)
+        out = []
+        for i in members[1:]:
+            q = items[i]
+            s = sim.get((root, i)) or jaccard(sets[root], sets[i])
+            out.append({"id": q["id"], "group": q.get("group"), "title": (q.get("title") or "")[:60],
+                        "similarity": round(s, 3), "same_answer": _answer_texts(q) == canon_ans})
+        clusters.append({"canonical": canon["id"], "group": canon.get("group"),
+                         "title": (canon.get("title") or "")[:60], "members": out})
+    return clusters
+
+def collapse(items: List[Dict], clusters: List[Dict]) -> List[Dict]:
+    """대표만 남김 (정답이 다른 문항은 유지)"""
+    drop = {m["id"] for c in clusters for m in c["members"] if m["same_answer"]}
+    return [q for q in items if q["id"] not in drop]
@@ -1,33 +1,256 @@
 # extract_text.py
-import pdfplumber, sys, pathlib
+# 사용법: python extract_text.py [--jobs N] [--no-cache] [--cache-max-mb MB]
+# - --jobs N : N개 프로세스가 페이지 구간을 나눠 추출 (기본 1 = 단일 프로세스)
+# - 결과는 페이지 순서대로 재조립되므로 단일 프로세스 결과와 바이트 단위로 동일
+# - 페이지 캐시: 페이지 내용 해시(콘텐츠 스트림 + 리소스 트리 전체) + pdfplumber 버전을 키로 cache/pages/ 에 저장
+#   → 재실행 시 바뀐 페이지만 다시 추출 (용량 상한 초과 시 오래 안 쓴 것부터 삭제)
+# - 저장: 페이지마다 part*.txt.part 에 바로 기록하고 끝나면 part*.txt 로 원자적 교체
+#   중간에 끊기면 part*.txt.ckpt 에 남은 진행 위치부터 이어서 추출
+import pdfplumber, sys, pathlib, argparse, os, hashlib, json
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pdfminer.pdftypes import PDFObjRef, PDFStream, resolve1
 from tqdm import tqdm
 
 ROOT = pathlib.Path(__file__).parent
 IN  = ROOT / "input"
 OUT = ROOT / "output"
+CACHE_DIR = ROOT / "cache" / "pages"
+CACHE_MAX_MB = 512
 
 FILES = [
     ("SAA-C03_KOR(1).pdf", "part1.txt"),
     ("SAA-C03_KOR(2).pdf", "part2.txt"),
 ]
 
-def dump_pdf(src, dst):
+# 워커 1개가 한 번에 맡는 페이지 수 (너무 크면 부하 불균형, 너무 작으면 PDF 재오픈 비용)
+CHUNK_PAGES = 25
+
+def _page_text(page) -> str:
+    try:
+        return (page.extract_text() or "") + "\n"
+    finally:
+        page.close()  # 페이지별 레이아웃 캐시 해제 (대용량 PDF 메모리 누적 방지)
+
+# 워커: PDF를 직접 열고 지정된 페이지들만 추출
+def _extract_pages(src, indices: list[int]) -> list[str]:
     with pdfplumber.open(src) as pdf:
-        lines = []
-        for page in tqdm(pdf.pages, desc=src.name):
-            text = page.extract_text() or ""
-            lines.append(text + "\n")
-    dst.write_text("".join(lines), encoding="utf-8")
+        return [_page_text(pdf.pages[i]) for i in indices]
+
+# ---------- 페이지 캐시 ----------
+
+def _obj_digest(obj, memo: dict, active: set) -> bytes:
+    """PDF 객체 트리 내용 해시 (스트림은 속성 + 데이터, 간접 참조는 따라가서 objid 별로 memo)"""
+    if isinstance(obj, PDFObjRef):
+        oid = obj.objid
+        d = memo.get(oid)
+        if d is None:
+            if oid in active:               # 순환 참조
+                return b"ref:%d" % oid
+            active.add(oid)
+            d = memo[oid] = _obj_digest(obj.resolve(), memo, active)
+            active.discard(oid)
+        return d
+    h = hashlib.sha256()
+    if isinstance(obj, PDFStream):
+        h.update(b"S")
+        h.update(_obj_digest(obj.attrs, memo, active))
+        data = obj.get_rawdata()            # 아직 안 풀었으면 원본 바이트 (압축 해제 생략)
+        h.update(obj.get_data() if data is None else data)
+    elif isinstance(obj, dict):
+        h.update(b"D")
+        for k in sorted(obj, key=str):
+            h.update(str(k).encode())
+            h.update(_obj_digest(obj[k], memo, active))
+    elif isinstance(obj, (list, tuple)):
+        h.update(b"L")
+        for v in obj:
+            h.update(_obj_digest(v, memo, active))
+    else:
+        h.update(repr(obj).encode())
+    return h.digest()
+
+class PageCache:
+    """페이지 텍스트 디스크 캐시 (키 = 페이지 내용 해시, LRU = 파일 mtime)"""
+
+    def __init__(self, root: pathlib.Path, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def key(page, memo: dict | None = None) -> str:
+        # 페이지 콘텐츠 스트림 + 리소스 트리 전체(폰트, Form XObject 와 그 안의 리소스 ...) + 크기/회전
+        # + pdfplumber 버전. 콘텐츠가 "q /X0 Do Q" 뿐인 페이지도 가리키는 XObject 내용으로 구분됨
+        # 벤더가 일부 페이지만 고쳐 재배포해도 나머지 페이지는 같은 키가 나옴
+        # memo: 같은 PDF 안에서 공유 객체(폰트/XObject) 해시 재사용 (objid → digest)
+        memo = {} if memo is None else memo
+        h = hashlib.sha256()
+        h.update(pdfplumber.__version__.encode())
+        h.update(repr((page.bbox, page.page_obj.attrs.get("Rotate"))).encode())
+        for stream in page.page_obj.contents:
+            h.update(resolve1(stream).get_data())
+        h.update(_obj_digest(page.page_obj.resources or {}, memo, set()))
+        return h.hexdigest()
+
+    def _path(self, key: str) -> pathlib.Path:
+        return self.root / f"{key}.txt"
+
+    def has(self, key: str) -> bool:
+        return self._path(key).exists()
+
+    def get(self, key: str):
+        p = self._path(key)
+        try:
+            data = p.read_bytes()
+        except OSError:
+            return None
+        os.utime(p)  # 최근 사용 표시
+        return data.decode("utf-8")
+
+    def put(self, key: str, text: str):
+        p = self._path(key)
+        tmp = p.with_suffix(".tmp")
+        tmp.write_bytes(text.encode("utf-8"))
+        os.replace(tmp, p)
+
+    def prune(self):
+        entries = []
+        total = 0
+        for p in self.root.glob("*.txt"):
+            st = p.stat()
+            entries.append((st.st_mtime, st.st_size, p))
+            total += st.st_size
+        entries.sort()
+        for _, size, p in entries:
+            if total <= self.max_bytes:
+                break
+            p.unlink(missing_ok=True)
+            total -= size
+
+# ---------- 추출 ----------
+
+def _chunks(seq: list[int], step: int):
+    for s in range(0, len(seq), step):
+        yield seq[s:s + step]
+
+def iter_pages(src, jobs: int = 1, cache: PageCache | None = None, start: int = 0):
+    """페이지 텍스트(각각 끝에 개행 포함)를 페이지 순서대로 하나씩 내보냄.
+    캐시에 있는 페이지는 추출 생략, 병렬 모드는 앞선 구간 몇 개만 미리 추출.
+    start 이전 페이지는 건너뜀 (체크포인트 이어받기용)"""
+    with pdfplumber.open(src) as pdf:
+        n = len(pdf.pages)
+        keys = [None] * n
+        if cache is not None:
+            memo = {}
+            for i in range(start, n):
+                keys[i] = cache.key(pdf.pages[i], memo)
+        todo = [i for i in range(start, n) if keys[i] is None or not cache.has(keys[i])]
+        if cache is not None:
+            print(f"[CACHE] {src.name}: 적중 {n - start - len(todo)} / 추출 {len(todo)}")
+
+        ex = None
+        if jobs > 1 and len(todo) > 1:
+            ex = ProcessPoolExecutor(max_workers=jobs)
+        try:
+            todo_set = set(todo) if ex else ()
+            chunks = _chunks(todo, max(1, min(CHUNK_PAGES, -(-len(todo) // jobs))))
+            pending = deque()   # (페이지 목록, future) — 제출 순서 = 페이지 순서
+            ready = {}
+            for i in tqdm(range(start, n), desc=src.name, total=n, initial=start):
+                if i in todo_set:
+                    if i not in ready:
+                        # 메모리가 커지지 않도록 워커 수의 2배 구간까지만 미리 제출
+                        while len(pending) < jobs * 2:
+                            c = next(chunks, None)
+                            if c is None:
+                                break
+                            pending.append((c, ex.submit(_extract_pages, src, c)))
+                        c, fut = pending.popleft()
+                        ready.update(zip(c, fut.result()))
+                    text = ready.pop(i)
+                else:
+                    text = cache.get(keys[i]) if keys[i] is not None else None
+                    if text is not None:
+                        yield text
+                        continue
+                    text = _page_text(pdf.pages[i])
+                if cache is not None:
+                    cache.put(keys[i], text)
+                yield text
+        finally:
+            if ex is not None:
+                ex.shutdown(cancel_futures=True)
+
+# ---------- 저장 (스트리밍 + 체크포인트) ----------
+
+def _src_stamp(src) -> dict:
+    st = os.stat(src)
+    return {"src": str(src), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+def _load_checkpoint(ckpt: pathlib.Path, tmp: pathlib.Path, stamp: dict):
+    """유효한 체크포인트면 (완료 페이지 수, 바이트 위치), 아니면 (0, 0)"""
+    try:
+        data = json.loads(ckpt.read_text(encoding="utf-8"))
+        if {k: data.get(k) for k in stamp} == stamp and tmp.stat().st_size >= data["bytes"]:
+            return int(data["pages"]), int(data["bytes"])
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return 0, 0
+
+def _save_checkpoint(ckpt: pathlib.Path, stamp: dict, pages: int, nbytes: int):
+    tmp = ckpt.with_name(ckpt.name + ".tmp")
+    tmp.write_text(json.dumps({**stamp, "pages": pages, "bytes": nbytes}), encoding="utf-8")
+    os.replace(tmp, ckpt)
+
+def dump_pdf(src, dst, jobs: int = 1, cache: PageCache | None = None):
+    tmp  = dst.with_name(dst.name + ".part")
+    ckpt = dst.with_name(dst.name + ".ckpt")
+    stamp = _src_stamp(src)
+
+    start, nbytes = _load_checkpoint(ckpt, tmp, stamp)
+    if start:
+        print(f"[RESUME] {dst.name}: {start}페이지부터 이어서 추출")
+        with open(tmp, "r+b") as fb:
+            fb.truncate(nbytes)  # 체크포인트 이후에 쓰다 만 부분 제거
+    else:
+        tmp.unlink(missing_ok=True)
+
+    # 텍스트 모드(utf-8)로 기록 → 기존 write_text 와 같은 개행 처리
+    with open(tmp, "a", encoding="utf-8") as f:
+        done = start
+        for text in iter_pages(src, jobs=jobs, cache=cache, start=start):
+            f.write(text)
+            f.flush()
+            done += 1
+            _save_checkpoint(ckpt, stamp, done, os.fstat(f.fileno()).st_size)
+
+    os.replace(tmp, dst)
+    ckpt.unlink(missing_ok=True)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="PDF → 텍스트 추출")
+    ap.add_argument("--jobs", type=int, default=1,
+                    help="병렬 추출 프로세스 수 (0 = CPU 코어 수)")
+    ap.add_argument("--no-cache", action="store_true",
+                    help="페이지 캐시를 쓰지 않고 모든 페이지를 새로 추출")
+    ap.add_argument("--cache-max-mb", type=int, default=CACHE_MAX_MB,
+                    help=f"페이지 캐시 용량 상한 (MB, 기본 {CACHE_MAX_MB})")
+    args = ap.parse_args(argv)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    cache = None if args.no_cache else PageCache(CACHE_DIR, args.cache_max_mb * 1024 * 1024)
 
-def main():
     for src_name, out_name in FILES:
         src = IN / src_name
         dst = OUT / out_name
         if not src.exists():
             print(f"[WARN] 파일 없음: {src}")
             continue
-        dump_pdf(src, dst)
+        dump_pdf(src, dst, jobs=jobs, cache=cache)
         print(f"[OK] {dst} 저장")
 
+    if cache is not None:
+        cache.prune()
+
 if __name__ == "__main__":
     main()
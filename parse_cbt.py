@@ -8,11 +8,24 @@
 # - 정답 라벨: Answer/Answers/정답/답: 뒤에서 A,C / 1,3 / ①③ / 가,다 / AC / A/C 등 모두 파싱
 # - 최종 출력: choices=[텍스트...] (2~N), answers=["A","C","E"...] (보기 개수만큼 A..Z 부여)
 # - ID 정규화: part2 Q100~119 → 1000~1019, part2 Q1~99 → 1020~1118
+# - ID 충돌: 원래 ID를 가진 문항 중 내용 키(그룹, 원본 Q 번호, 제목, 지문)가 가장 앞선 것은 그대로,
+#   나머지는 그 ID 이후 첫 빈 ID로 재배정 → id_collisions.json 기록 (그룹/원본 Q 번호 → 최종 ID)
+# - --pack: 같은 폴더에 bank.pack(단일 파일, ID 인덱스 + 레코드) 추가 저장 → app 시작 시 인덱스만 읽음
+# - --dedup: 표현만 조금 다른 중복 문항을 MinHash/LSH 로 찾아 dup_clusters.json 기록
+#   --dedup-collapse: 클러스터마다 대표 ID 한 개만 남기고 저장 (정답이 다른 문항은 유지)
+# - --sqlite: 같은 폴더에 bank.sqlite3(문항/보기 테이블 + FTS5 검색 색인) 추가 저장 → 출제 시 뽑힌 문항만 조회
 # - 저장: ID 범위별 100단위 파일(Q1~Q100.json 등). 빈 구간은 생략
 
 from pathlib import Path
-import re, json, unicodedata
-from typing import List, Dict
+import re, json, os, sys, bisect, argparse, unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Dict, Iterable, Iterator
+
+import dedup
+from app.services.loader import shard_manifest
+from app.services.packbank import PACK_NAME, write_pack
+from app.services.sqlite_store import DB_NAME, write_store
 
 ROOT = Path(__file__).parent
 IN   = ROOT / "output"
@@ -24,7 +37,6 @@ PARTS = [
 ]
 
 # ---------- 패턴 ----------
-RE_QLINE = re.compile(r"^\s*Q\s*(\d{1,4})\s*(.*)$", re.M)
 RE_LINK  = re.compile(r"^https?://", re.I)
 RE_ANS   = re.compile(r"^(?:Answer|Answers|정답|답)\s*[:：]\s*(.+)$", re.I)
 RE_EXPL  = re.compile(r"^설명\d*\s*[:：]\s*(.*)$")
@@ -79,78 +91,174 @@ def token_to_pos(tok: str):
         return KOR_MAP[t]
     return None
 
+# 글자 → 보기 순번 표 (token_to_pos 결과를 미리 계산, 처음 보는 글자는 조회 시 채움)
+# 구분자(공백 , / & …)는 None 이므로 토큰 분리 없이 글자만 훑어도 결과가 같음
+# (①~⑳은 NFKC 정규화 후 숫자로 바뀌므로 표에 넣을 필요 없음)
+_POS_TABLE: Dict[str, object] = {ch: token_to_pos(ch) for ch in [chr(c) for c in range(128)] + KOR_SEQ}
+_MISSING = object()
+
+RE_ANS_NOTE = re.compile(r"[\(\[（【].*?[\)\]）】]")
+_ANS_CONJ = ("그리고", "및", "와", "또는", "or")
+
 # 정답 포지션 파싱: AC / A,C / 1,3 / ①③ / 가나다 / A/C 등 모두 대응
+# 정답 줄은 "A", "B,D", "①③" 처럼 반복이 많아 원문 문자열 단위로 결과를 기억
 
-def parse_answer_positions(raw: str) -> List[int]:
-    s = _to_ascii((raw or "").strip())
+@lru_cache(maxsize=4096)
+def _answer_positions(raw: str) -> tuple:
+    s = _to_ascii(raw.strip())
     if not s:
-        return []
+        return ()
     # 괄호/대괄호의 주석 제거 (예: (복수정답))
-    s = re.sub(r"[\(\[（【].*?[\)\]）】]", "", s)
+    s = RE_ANS_NOTE.sub("", s)
     # 한글 접속사 정규화
-    s = s.replace("그리고", ",").replace("및", ",").replace("와", ",").replace("또는", ",").replace("or", ",")
-
-    parts = [p for p in SPLIT_TOK.split(s) if p]
-    poses: List[int] = []
-    for p in parts:
-        if p.isdigit():
-            # 숫자 묶음은 개별 숫자 분해 (예: 135 → 1,3,5)
-            for ch in p:
-                pos = token_to_pos(ch)
-                if pos: poses.append(pos)
-            continue
-        # 문자/기호 혼합은 한 글자씩 분해 (예: AC, ①③⑤, 가나다)
-        for ch in p:
-            pos = token_to_pos(ch)
-            if pos:
-                poses.append(pos)
-    return sorted(set(poses))
+    for w in _ANS_CONJ:
+        if w in s:
+            s = s.replace(w, ",")
+
+    table = _POS_TABLE
+    poses = set()
+    for ch in s:
+        pos = table.get(ch, _MISSING)
+        if pos is _MISSING:
+            pos = table[ch] = token_to_pos(ch)
+        if pos:
+            poses.add(pos)
+    return tuple(sorted(poses))
+
+def parse_answer_positions(raw: str) -> List[int]:
+    return list(_answer_positions(raw or ""))
 
 # ---------- 파싱 ----------
+#
+# 줄을 한 번만 훑는 상태기계. Q헤더 규칙은 전체 텍스트에 걸던 기존 패턴 ^\s*Q\s*(\d{1,4})\s*(.*)$ (re.M)과 동일:
+# - 공백을 건너뛴 첫 글자가 Q, 이어서 (줄바꿈 포함) 공백 뒤 숫자 1~4자리
+# - 숫자 뒤가 비어 있으면 다음 비어있지 않은 줄 전체가 제목(inline)이 됨
+# - 헤더가 아닌 줄은 현재 Q블록의 본문
+
+# 첫 글자 → 보기 패턴 (숫자는 isdecimal로 따로 판정)
+_CHOICE_BY_FIRST = {ch: RE_CHOICE_ALPHA for ch in LETTERS}
+_CHOICE_BY_FIRST.update({ch: RE_CHOICE_CIRC for ch in CIRC_MAP})
+_CHOICE_BY_FIRST.update({ch: RE_CHOICE_KOR for ch in KOR_MAP})
+
+def _split_qnum(t: str):
+    """숫자로 시작하는 문자열 → (번호, 나머지 lstrip). 숫자는 최대 4자리"""
+    k = 1
+    while k < 4 and k < len(t) and t[k].isdecimal():
+        k += 1
+    return int(t[:k]), t[k:].lstrip()
+
+def _build_item(group: str, qn: int, title: str, context: List[str], choices: List[str],
+                ans_pos: List[int], links: List[str], explain: List[str]):
+    # 유효성: 보기 2+ & 정답 1+
+    if len(choices) < 2 or len(ans_pos) < 1:
+        return None
 
-def parse_one(raw_text: str, group: str) -> List[Dict]:
-    lines = [ln.rstrip() for ln in raw_text.splitlines()]
-    joined = "\n".join(lines)
-    matches = list(RE_QLINE.finditer(joined))
-    if not matches:
-        return []
-
-    items: List[Dict] = []
-    for idx, m in enumerate(matches):
-        qn = int(m.group(1))
-        inline = m.group(2).strip()
-        start = m.end()
-        end   = matches[idx+1].start() if idx+1 < len(matches) else len(joined)
-
-        body: List[str] = []
-        if inline:
-            body.append(inline)
-        if start < end:
-            body += joined[start:end].splitlines()
-
-        title = ""; context: List[str] = []
-        choices: List[str] = []
-        ans_pos: List[int] = []
-        links: List[str] = []
-        explain: List[str] = []
-
-        for ln in body:
-            s = ln.strip()
-            if not s:
+    # 포지션 → A..Z (choices 길이 초과/26 초과는 제거)
+    ans_letters: List[str] = []
+    for pos in ans_pos:
+        if 1 <= pos <= len(choices) and pos <= 26:
+            ans_letters.append(LETTERS[pos-1])
+    ans_letters = sorted(set(ans_letters), key=lambda x: LETTERS.index(x))
+    if not ans_letters:
+        return None
+
+    obj = {
+        "id": _normalize_id(group, qn),
+        "group": ("new" if (group == "part2" and 1 <= qn <= 99) else group),
+        "qnum": qn,                 # 원본 Q 번호 (ID 충돌 보고서용, assign_unique_ids 에서 뺌)
+        "title": title.strip(),
+        "context": " ".join(context).strip(),
+        "choices": choices,         # 2~N개 (N<=26)
+        "answers": ans_letters,     # ["A"..]
+    }
+    if links:
+        obj["link"]  = links[0]
+        obj["links"] = links
+    if explain:
+        obj["explain"] = "\n".join(explain)
+    return obj
+
+# 상태
+S_BODY, S_WAIT_NUM, S_WAIT_INLINE = range(3)
+
+def iter_parse(lines: Iterable[str], group: str) -> Iterator[Dict]:
+    """줄 iterable → 문항 dict. Q블록이 닫히는 즉시 하나씩 내보냄"""
+    state = S_BODY
+    opened = False  # 첫 헤더 이전 줄은 버림
+    qn = 0
+    title = ""; context: List[str] = []
+    choices: List[str] = []
+    ans_pos: List[int] = []
+    links: List[str] = []
+    explain: List[str] = []
+
+    for ln in lines:
+        s = ln.strip()
+        if not s:
+            continue  # 빈 줄은 본문에서도, 헤더 대기 중에도 의미 없음
+
+        # --- 헤더 판정 ---
+        header = False
+        if state == S_WAIT_INLINE:
+            # 'Q12'처럼 번호 뒤가 비었던 헤더 → 이 줄 전체가 제목
+            state = S_BODY
+            header = True
+        elif state == S_WAIT_NUM:
+            # 'Q'만 있던 줄 다음 → 숫자로 시작하면 헤더
+            state = S_BODY
+            if s[0].isdecimal():
+                qn, s = _split_qnum(s)
+                if not s:
+                    state = S_WAIT_INLINE
+                    continue
+                header = True
+            elif opened:
+                # 헤더가 아니었으므로 'Q' 줄은 일반 문장
+                if not title:
+                    title = "Q"
+                else:
+                    context.append("Q")
+
+        if not header and s[0] == "Q":
+            r = s[1:].lstrip()
+            if not r:
+                state = S_WAIT_NUM
                 continue
+            if r[0].isdecimal():
+                qn, s = _split_qnum(r)
+                if not s:
+                    state = S_WAIT_INLINE
+                    continue
+                header = True
+
+        if header:
+            # 이전 블록 확정 후 새 블록 시작, s(같은 줄 제목)는 아래에서 본문 첫 줄로 처리
+            if opened:
+                q = _build_item(group, cur_qn, title, context, choices, ans_pos, links, explain)
+                if q is not None:
+                    yield q
+            opened = True
+            cur_qn = qn
+            title = ""; context = []
+            choices = []; ans_pos = []; links = []; explain = []
+        elif not opened:
+            continue
 
+        # --- 본문 줄: 첫 글자로 후보 패턴을 골라 최대 두 번만 match ---
+        c = s[0]
+        if c in "Aa정답":
             ma = RE_ANS.match(s)
             if ma:
                 ans_pos += parse_answer_positions(ma.group(1))
                 continue
-
+        elif c == "설":
             me = RE_EXPL.match(s)
             if me:
                 ex = me.group(1).strip()
                 if ex:
                     explain.append(ex)
                 continue
-
+        elif c in "hH":
             if RE_LINK.match(s):
                 # clean_lines.py에서 이미 1줄 URL로 복구됨
                 links.append(s)
@@ -159,52 +267,54 @@ def parse_one(raw_text: str, group: str) -> List[Dict]:
                     explain.append(s)
                 continue
 
-            mc = (RE_CHOICE_ALPHA.match(s) or RE_CHOICE_NUM.match(s) or
-                  RE_CHOICE_CIRC.match(s)  or RE_CHOICE_KOR.match(s))
+        pat = _CHOICE_BY_FIRST.get(c) or (RE_CHOICE_NUM if c.isdecimal() else None)
+        if pat is not None:
+            mc = pat.match(s)
             if mc:
                 text = mc.groups()[-1].strip()
                 if text:
                     choices.append(text)
                 continue
 
-            # 일반 문장 (제목/지문)
+        # 일반 문장 (제목/지문)
+        if not title:
+            title = s
+        else:
+            context.append(s)
+
+    if opened:
+        if state == S_WAIT_NUM:
             if not title:
-                title = s
+                title = "Q"
             else:
-                context.append(s)
+                context.append("Q")
+        q = _build_item(group, cur_qn, title, context, choices, ans_pos, links, explain)
+        if q is not None:
+            yield q
 
-        # 유효성: 보기 2+ & 정답 1+
-        if len(choices) < 2 or len(ans_pos) < 1:
-            continue
+def parse_one(raw_text: str, group: str) -> List[Dict]:
+    return list(iter_parse(raw_text.splitlines(), group))
 
-        # 포지션 → A..Z (choices 길이 초과/26 초과는 제거)
-        ans_letters: List[str] = []
-        for pos in ans_pos:
-            if 1 <= pos <= len(choices) and pos <= 26:
-                ans_letters.append(LETTERS[pos-1])
-        ans_letters = sorted(set(ans_letters), key=lambda x: LETTERS.index(x))
-        if not ans_letters:
-            continue
+# ---------- 저장 ----------
 
-        obj = {
-            "id": _normalize_id(group, qn),
-            "group": ("new" if (group == "part2" and 1 <= qn <= 99) else group),
-            "title": title.strip(),
-            "context": " ".join(context).strip(),
-            "choices": choices,         # 2~N개 (N<=26)
-            "answers": ans_letters,     # ["A"..]
-        }
-        if links:
-            obj["link"]  = links[0]
-            obj["links"] = links
-        if explain:
-            obj["explain"] = "\n".join(explain)
+SHARD_SIZE = 100
+COLLISION_REPORT = "id_collisions.json"
+SAVE_WORKERS = 8
 
-        items.append(obj)
+def _write_atomic(path: Path, text: str):
+    """임시 파일에 쓴 뒤 rename → 읽는 쪽(load_bank)은 항상 완성된 파일만 봄"""
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
 
-    return items
+def shard_name(qid: int) -> str:
+    """id 가 들어갈 분할 파일 이름 (Q1~Q100.json, Q101~Q200.json ...)"""
+    start_id = (qid - 1) // SHARD_SIZE * SHARD_SIZE + 1
+    return f"Q{start_id}~Q{start_id + SHARD_SIZE - 1}.json"
 
-# ---------- 저장 ----------
+def in_shard_order(items: List[Dict]) -> List[Dict]:
+    """load_bank 이 JSON 분할 파일을 읽는 순서 (파일 이름 사전순 → 파일 안에서는 id 순)"""
+    return sorted(items, key=lambda x: (shard_name(x["id"]), x["id"]))
 
 def save_split_by_id_range(items: List[Dict]):
     if not items:
@@ -212,25 +322,137 @@ def save_split_by_id_range(items: List[Dict]):
     items.sort(key=lambda x: x["id"])  
     OUT.mkdir(parents=True, exist_ok=True)
 
-    min_id = min(x["id"] for x in items)
-    max_id = max(x["id"] for x in items)
-    start_id = ((min_id - 1)//100)*100 + 1
-    nfiles = 0
-    while start_id <= max_id:
-        end_id = start_id + 99
-        chunk = [x for x in items if start_id <= x["id"] <= end_id]
-        if chunk:
-            fname = f"Q{start_id}~Q{end_id}.json"
-            (OUT / fname).write_text(json.dumps(chunk, ensure_ascii=False, indent=2), encoding="utf-8")
-            nfiles += 1
-        start_id += 100
+    # 한 번 훑어서 100단위 구간별로 분류 (정렬돼 있으므로 구간 내 순서도 유지)
+    buckets: Dict[int, List[Dict]] = {}
+    for x in items:
+        buckets.setdefault((x["id"] - 1) // SHARD_SIZE, []).append(x)
+
+    def write(k: int):
+        fname = shard_name(k * SHARD_SIZE + 1)
+        _write_atomic(OUT / fname, json.dumps(buckets[k], ensure_ascii=False, indent=2))
+
+    with ThreadPoolExecutor(max_workers=SAVE_WORKERS) as ex:
+        list(ex.map(write, buckets))
+    nfiles = len(buckets)
     print(f"[OK] ID 범위 분할 저장 완료: {nfiles}개 파일 | 총 문항={len(items)} | 경로={OUT}")
 
 # ---------- 실행 ----------
 
-def main():
+class IdAllocator:
+    """비어 있는 ID 구간 [lo, hi]를 정렬된 리스트로 관리, x 이상 첫 빈 ID를 이분 탐색으로 찾음"""
+    INF = sys.maxsize
+
+    def __init__(self, used: Iterable[int]):
+        self._lo: List[int] = []
+        self._hi: List[int] = []
+        prev = None
+        for u in sorted(set(used)):
+            if prev is not None and u > prev + 1:
+                self._lo.append(prev + 1)
+                self._hi.append(u - 1)
+            prev = u
+        if prev is not None:
+            self._lo.append(prev + 1)
+            self._hi.append(self.INF)
+
+    def take(self, x: int) -> int:
+        """x 이상에서 가장 작은 빈 ID를 할당하고 반환"""
+        i = bisect.bisect_left(self._hi, x)
+        lo, hi = self._lo[i], self._hi[i]
+        v = max(lo, x)
+        if lo == hi:
+            del self._lo[i], self._hi[i]
+        elif v == lo:
+            self._lo[i] = v + 1
+        elif v == hi:
+            self._hi[i] = v - 1
+        else:  # 구간 가운데 → 둘로 쪼갬
+            self._hi[i] = v - 1
+            self._lo.insert(i + 1, v + 1)
+            self._hi.insert(i + 1, hi)
+        return v
+
+# ID 중복 회피: 입력 순서와 무관하게 같은 결과가 나오도록 (다시 빌드해도 같은 문항이 같은 ID)
+# 1) 같은 ID 끼리는 내용 키(그룹, 원본 Q 번호, 제목, 지문) 순 → 첫 문항이 자기 ID 유지
+# 2) 나머지는 원래 ID 이후 첫 빈 ID
+def _collision_key(q: Dict):
+    return (q["id"], q.get("group") or "", q.get("qnum") or 0, q.get("title") or "", q.get("context") or "")
+
+def assign_unique_ids(items: List[Dict]) -> List[Dict]:
+    """ID를 제자리에서 고유하게 바꾸고 충돌 보고서(원본 그룹/Q 번호 → 최종 ID)를 반환.
+    문항에 실려 온 qnum 은 보고서에만 남기고 문항에서는 뺌"""
+    order = sorted(items, key=_collision_key)
+    used = set()
+    dups: List[Dict] = []
+    for q in order:
+        if q["id"] in used:
+            dups.append(q)
+        else:
+            used.add(q["id"])
+
+    alloc = IdAllocator(used)
+    report: List[Dict] = []
+    for q in dups:
+        orig = q["id"]
+        q["id"] = alloc.take(orig)
+        report.append({"group": q.get("group"), "qnum": q.get("qnum"), "orig_id": orig, "final_id": q["id"],
+                       "title": (q.get("title") or "")[:60]})
+    for q in items:
+        q.pop("qnum", None)
+    return report
+
+def save_collision_report(report: List[Dict]):
+    OUT.mkdir(parents=True, exist_ok=True)
+    path = OUT / COLLISION_REPORT
+    _write_atomic(path, json.dumps(report, ensure_ascii=False, indent=2))
+    print(f"[OK] ID 충돌 {len(report)}건 재배정 | 보고서={path}")
+
+def dedup_items(items: List[Dict], collapse: bool = False) -> List[Dict]:
+    """근사 중복 클러스터 보고서 저장, collapse 면 대표만 남긴 목록 반환"""
+    clusters = dedup.find_clusters(items)
+    OUT.mkdir(parents=True, exist_ok=True)
+    path = OUT / dedup.REPORT_NAME
+    _write_atomic(path, json.dumps(clusters, ensure_ascii=False, indent=2))
+    n_dup = sum(len(c["members"]) for c in clusters)
+    print(f"[OK] 근사 중복 {len(clusters)}묶음 / {n_dup}문항 | 보고서={path}")
+    if not collapse:
+        return items
+    kept = dedup.collapse(items, clusters)
+    print(f"[OK] 중복 제거: {len(items)} → {len(kept)}문항")
+    return kept
+
+def save_pack(items: List[Dict]):
+    """JSON 분할 파일 옆에 bank.pack 저장 (GUI가 인덱스만 읽고 바로 시작할 수 있음).
+    문항 순서는 분할 파일을 읽는 순서와 같게 → 같은 seed 면 어느 쪽으로 읽어도 같은 문항.
+    지금 분할 파일 목록(크기/mtime/해시)도 같이 저장 → 파일이 바뀌거나 빠지면 load_bank 이 JSON 을 읽음"""
+    OUT.mkdir(parents=True, exist_ok=True)
+    path = OUT / PACK_NAME
+    write_pack(path, in_shard_order([x for x in items if x.get("choices") and x.get("answers")]),
+               shard_manifest(OUT))
+    print(f"[OK] pack 저장: {path}")
+
+def save_sqlite(items: List[Dict]):
+    """JSON 분할 파일 옆에 bank.sqlite3 저장 (SQL 로 출제/필터/전문 검색).
+    문항 순서는 pack 과 마찬가지로 분할 파일을 읽는 순서"""
+    OUT.mkdir(parents=True, exist_ok=True)
+    path = OUT / DB_NAME
+    write_store(path, in_shard_order([x for x in items if x.get("choices") and x.get("answers")]),
+                shard_manifest(OUT))
+    print(f"[OK] sqlite 저장: {path}")
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="정리된 텍스트 → 문항 JSON (ID 범위 분할 저장)")
+    ap.add_argument("--pack", action="store_true",
+                    help=f"JSON 분할 파일 옆에 {PACK_NAME}(단일 파일 + ID 인덱스)도 저장")
+    ap.add_argument("--sqlite", action="store_true",
+                    help=f"JSON 분할 파일 옆에 {DB_NAME}(SQLite + FTS5 검색 색인)도 저장")
+    ap.add_argument("--dedup", action="store_true",
+                    help=f"근사 중복 문항 클러스터를 {dedup.REPORT_NAME} 로 저장")
+    ap.add_argument("--dedup-collapse", action="store_true",
+                    help="근사 중복 클러스터마다 대표 문항만 남김 (--dedup 포함)")
+    args = ap.parse_args(argv)
+
     all_items: List[Dict] = []
-    seen = set()
     for fname, group in PARTS:
         p = IN / fname
         if not p.exists():
@@ -239,13 +461,15 @@ def main():
         raw = p.read_text(encoding="utf-8", errors="ignore")
         all_items.extend(parse_one(raw, group))
 
-    # ID 중복 회피
-    for q in all_items:
-        while q["id"] in seen:
-            q["id"] += 1
-        seen.add(q["id"]) 
-
+    report = assign_unique_ids(all_items)
+    if args.dedup or args.dedup_collapse:
+        all_items = dedup_items(all_items, collapse=args.dedup_collapse)
     save_split_by_id_range(all_items)
+    save_collision_report(report)
+    if args.pack:
+        save_pack(all_items)
+    if args.sqlite:
+        save_sqlite(all_items)
 
 if __name__ == "__main__":
     main()
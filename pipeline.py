@@ -0,0 +1,98 @@
+# pipeline.py (추출 → 줄 정리 → 파싱 한 번에)
+# 사용법: python pipeline.py [--jobs N] [--no-cache] [--debug-dir DIR] [--pack] [--sqlite] [--dedup | --dedup-collapse]
+#
+# extract_text.py → clean_lines.py → parse_cbt.py 를 중간 txt 파일 없이 스트리밍으로 연결
+# - 페이지 텍스트 → 줄 → 정리된 줄 → Q블록 → 문항 순으로 제너레이터를 통과
+# - 문항은 Q블록이 닫히는 즉시 만들어지므로 PDF 크기와 무관하게 텍스트는 몇 페이지 분량만 메모리에 유지
+# - --debug-dir 지정 시 중간 단계(part*.txt, part*_clean.txt)를 흘려보내면서 같이 저장
+
+import argparse, os
+from pathlib import Path
+
+import extract_text, clean_lines, parse_cbt
+
+# (PDF, 추출 덤프명, 정리 덤프명, 그룹)
+SOURCES = [
+    ("SAA-C03_KOR(1).pdf", "part1.txt", "part1_clean.txt", "part1"),
+    ("SAA-C03_KOR(2).pdf", "part2.txt", "part2_clean.txt", "part2"),
+]
+
+def _tee(it, fh, sep=""):
+    """흘러가는 값을 그대로 넘기면서 파일에도 기록 (디버그 덤프용)"""
+    for x in it:
+        fh.write(x + sep)
+        yield x
+
+def run_one(src: Path, group: str, jobs: int = 1, cache=None,
+            raw_dump: Path | None = None, clean_dump: Path | None = None):
+    files = []
+    try:
+        pages = extract_text.iter_pages(src, jobs=jobs, cache=cache)
+        if raw_dump is not None:
+            files.append(raw_dump.open("w", encoding="utf-8"))
+            pages = _tee(pages, files[-1])
+        raw_lines = (ln for page in pages for ln in page.splitlines())
+
+        cleaned = clean_lines.iter_join_lines(raw_lines)
+        if clean_dump is not None:
+            files.append(clean_dump.open("w", encoding="utf-8"))
+            cleaned = _tee(cleaned, files[-1], "\n")
+        # 파일로 저장했다 다시 읽을 때와 같은 줄 구분이 되도록 한 번 더 splitlines
+        lines = (sub for ln in cleaned for sub in ln.splitlines())
+
+        yield from parse_cbt.iter_parse(lines, group)
+    finally:
+        for fh in files:
+            fh.close()
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="PDF → 문항 JSON 스트리밍 파이프라인")
+    ap.add_argument("--jobs", type=int, default=1,
+                    help="병렬 추출 프로세스 수 (0 = CPU 코어 수)")
+    ap.add_argument("--no-cache", action="store_true",
+                    help="페이지 캐시를 쓰지 않고 모든 페이지를 새로 추출")
+    ap.add_argument("--debug-dir", type=Path, default=None,
+                    help="중간 단계 텍스트(part*.txt, part*_clean.txt)를 저장할 폴더")
+    ap.add_argument("--pack", action="store_true",
+                    help="JSON 분할 파일 옆에 bank.pack 도 저장")
+    ap.add_argument("--sqlite", action="store_true",
+                    help="JSON 분할 파일 옆에 bank.sqlite3 (FTS5 검색 색인 포함) 도 저장")
+    ap.add_argument("--dedup", action="store_true",
+                    help="근사 중복 문항 클러스터 보고서(dup_clusters.json) 저장")
+    ap.add_argument("--dedup-collapse", action="store_true",
+                    help="근사 중복 클러스터마다 대표 문항만 남김 (--dedup 포함)")
+    args = ap.parse_args(argv)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    cache = None if args.no_cache else extract_text.PageCache(
+        extract_text.CACHE_DIR, extract_text.CACHE_MAX_MB * 1024 * 1024)
+    if args.debug_dir is not None:
+        args.debug_dir.mkdir(parents=True, exist_ok=True)
+
+    all_items = []
+    for pdf_name, raw_name, clean_name, group in SOURCES:
+        src = extract_text.IN / pdf_name
+        if not src.exists():
+            print(f"[WARN] 파일 없음: {src}")
+            continue
+        raw_dump = clean_dump = None
+        if args.debug_dir is not None:
+            raw_dump, clean_dump = args.debug_dir / raw_name, args.debug_dir / clean_name
+        n0 = len(all_items)
+        all_items.extend(run_one(src, group, jobs=jobs, cache=cache,
+                                 raw_dump=raw_dump, clean_dump=clean_dump))
+        print(f"[OK] {src.name}: {len(all_items) - n0}문항")
+
+    if cache is not None:
+        cache.prune()
+    report = parse_cbt.assign_unique_ids(all_items)
+    if args.dedup or args.dedup_collapse:
+        all_items = parse_cbt.dedup_items(all_items, collapse=args.dedup_collapse)
+    parse_cbt.save_split_by_id_range(all_items)
+    parse_cbt.save_collision_report(report)
+    if args.pack:
+        parse_cbt.save_pack(all_items)
+    if args.sqlite:
+        parse_cbt.save_sqlite(all_items)
+
+if __name__ == "__main__":
+    main()
@@ -5,15 +5,23 @@
 # - Windows 콘솔 UTF-8 대응(가능하면 pwsh 권장)
 
 from __future__ import annotations
-import json, random, sys
+import sys, time
 from pathlib import Path
 
+from app.services.grader import grade
+from app.services.loader import detach, opened_bank, sample_from_dir, weak_sample   # 스냅샷 캐시(.snapshot/)/bank.sqlite3 공유
+from app.services.history import HISTORY_NAME, load_stats, record_session
+from app.services.scheduler import Scheduler, record_review
+from app.utils.labels import letters_to_mask, mask_to_letters
+
 # === 설정 ===
 JSON_DIR = Path(r"C:\Users\mowja\CBT_Parser\Que")  # 분할 JSON 폴더
 NUM_QUESTIONS = 65
 PASS_CUTOFF   = 52  # 합격
 SAFE_CUTOFF   = 55  # 안정권
 PERF_CUTOFF   = 58  # 퍼펙토
+PARTIAL_CREDIT = False    # True면 복수정답 문항에 부분 점수 (app/config.py 와 같은 의미)
+EXAM_MODE     = "random"  # "random" = 무작위, "review" = 간격 반복 일정(복습할 문항 먼저), "weak" = 오답률 비례
 
 # === 유틸 ===
 MAP_1to4 = {"1":"A","2":"B","3":"C","4":"D"}
@@ -33,44 +41,9 @@ def normalize_user_answer(s: str) -> list[str]:
     return sorted(set(letters), key=lambda x: "ABCD".index(x))
 
 
-def load_bank(json_dir: Path) -> list[dict]:
-    files = sorted(json_dir.glob("Q*~Q*.json"))
-    bank = []
-    for f in files:
-        try:
-            data = json.loads(f.read_text(encoding="utf-8"))
-            if isinstance(data, list):
-                # 유효 항목만
-                for q in data:
-                    if isinstance(q, dict) and q.get("choices") and q.get("answers"):
-                        bank.append(q)
-        except Exception as e:
-            print(f"[WARN] {f.name} 읽기 실패: {e}")
-    return bank
-
-
-def grade(run: list[dict]) -> tuple[int, list[dict]]:
-    correct = 0
-    review = []
-    for q in run:
-        ua = q.get("user_answers", [])
-        ca = q.get("answers", [])
-        ok = set(ua) == set(ca)
-        if ok:
-            correct += 1
-        review.append({
-            "id": q.get("id"),
-            "title": q.get("title", "").strip(),
-            "correct": ok,
-            "user": ua,
-            "answer": ca,
-        })
-    return correct, review
-
-
-def print_status(correct: int):
+def print_status(correct: int | float):
     print("\n=== 결과 요약 ===")
-    print(f"정답 수: {correct}/{NUM_QUESTIONS}")
+    print(f"정답 수: {correct:g}/{NUM_QUESTIONS}")
     if correct >= PERF_CUTOFF:
         print("상태: PERFCTO ✅ (퍼펙토)")
     elif correct >= SAFE_CUTOFF:
@@ -81,7 +54,7 @@ def print_status(correct: int):
         print("상태: 미달 ❌")
 
 
-def ask_question(i: int, q: dict):
+def ask_question(i: int, q) -> list[str]:
     print("\n" + "-"*70)
     print(f"Q{i}. (ID {q.get('id')})")
     title = q.get("title", "").strip()
@@ -101,8 +74,7 @@ def ask_question(i: int, q: dict):
         raw = input("정답(예: A, AC, 1 3) > ")
         ua = normalize_user_answer(raw)
         if ua:
-            q["user_answers"] = ua
-            break
+            return ua
         print("입력이 올바르지 않습니다. (예: A 또는 AC 또는 1 3)")
 
 
@@ -110,22 +82,30 @@ def main():
     if not JSON_DIR.exists():
         print(f"JSON 폴더가 없습니다: {JSON_DIR}")
         sys.exit(1)
-    bank = load_bank(JSON_DIR)
-    if len(bank) < NUM_QUESTIONS:
-        print(f"문항 풀이용 은행이 부족합니다. ({len(bank)}개)")
+    # 시험 세트 생성 (무작위 출제는 은행 전체를 메모리에 올리지 않고 폴더에서 바로 뽑음)
+    try:
+        if EXAM_MODE == "review":
+            with opened_bank(JSON_DIR) as bank:     # 뽑은 문항만 풀어 두고 pack/DB 는 닫음
+                run = detach(Scheduler.load(JSON_DIR).pick(bank, NUM_QUESTIONS))
+        elif EXAM_MODE == "weak":
+            with opened_bank(JSON_DIR) as bank:
+                run = detach(weak_sample(bank, NUM_QUESTIONS, load_stats(JSON_DIR)))
+        else:
+            run = sample_from_dir(JSON_DIR, NUM_QUESTIONS)
+    except ValueError as e:     # 문제은행 부족
+        print(f"문항 풀이용 은행이 부족합니다. ({e})")
         sys.exit(1)
 
-    # 시험 세트 생성
-    random.seed()
-    run = random.sample(bank, NUM_QUESTIONS)
-
     print("AWS SAA-C03 모의시험 (콘솔)")
     print(f"총 {NUM_QUESTIONS}문제 / 합격 {PASS_CUTOFF}+ / 안정권 {SAFE_CUTOFF}+ / 퍼펙토 {PERF_CUTOFF}+")
 
+    user_answers = {}   # id → 고른 보기 비트마스크 (GUI 와 같은 형태로 채점/기록)
+    started_at = time.monotonic()
     for i, q in enumerate(run, 1):
-        ask_question(i, q)
+        user_answers[q.get("id")] = letters_to_mask(ask_question(i, q))
 
-    correct, review = grade(run)
+    correct, review = grade(run, user_answers, PARTIAL_CREDIT)
+    duration = time.monotonic() - started_at
     print_status(correct)
 
     # === 오답 전부 리뷰 ===
@@ -133,7 +113,8 @@ def main():
     print(f"\n=== 오답 리뷰 (총 {len(wrong)}문항) ===")
     for r in wrong:
         print("-" * 70)
-        print(f"ID {r['id']} | 정답: {','.join(r['answer'])} | 내 답: {','.join(r['user'])}")
+        print(f"ID {r['id']} | 정답: {','.join(mask_to_letters(r['answer_mask']))}"
+              f" | 내 답: {','.join(mask_to_letters(r['user_mask']))}")
         print(r["title"])
         # 설명/링크는 원본 문항에서 꺼냄
         q = next((qq for qq in run if qq.get("id") == r["id"]), None)
@@ -143,11 +124,17 @@ def main():
         if q and q.get("link"):
             print(f"링크: {q['link']}")
 
-    # 세션 기록 저장(선택)
-    out = JSON_DIR / "last_session_result.json"
-    payload = {"correct": correct, "total": NUM_QUESTIONS, "review": review}
-    out.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
-    print(f"\n세션 결과 저장: {out}")
+    # 세션 기록 추가 (history.jsonl, 문항별 통계는 history_stats.json)
+    try:
+        record_session(JSON_DIR, run, user_answers, review, correct, duration, source="console")
+        print(f"\n세션 기록 추가: {JSON_DIR / HISTORY_NAME}")
+    except OSError as e:
+        print(f"[WARN] 응시 기록 저장 실패: {e}")
+        return
+    try:                        # 일정 저장이 실패해도 결과/기록은 그대로
+        record_review(JSON_DIR, review, partial=PARTIAL_CREDIT)
+    except Exception as e:
+        print(f"[WARN] 복습 일정 저장 실패: {e}")
 
 if __name__ == "__main__":
     try: